@@ -0,0 +1,220 @@
+"""Band-crossing alerts for a watchlist of ticker stores.
+
+Every bar falls in one zone of its residual against the fitted line: below
+the lower band, buy, hold, sell or above the upper band. Each evaluation
+only reads the bars appended since the previous one (stores whose
+``meta.json`` did not change cost one ``stat``) and fires one alert per change of
+zone. The rows seen and the last zone per ticker are kept in
+``<store>/alerts.json``, so a restart neither repeats nor misses a crossing.
+
+    python alerts.py [TICKER ...] [--once] [--interval 60] [--sink log|file:PATH|webhook:URL ...]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import urllib.request
+from collections import namedtuple
+import numpy as np
+from df_maker import fit_spec
+from predictor import dayth_to_dates
+from price_store import PriceStore
+from sources import with_retries
+
+ZONES = ['below_band', 'buy', 'hold', 'sell', 'above_band']
+
+Alert = namedtuple('Alert', ['symbol', 'date', 'price', 'model_price', 'ratio', 'previous', 'zone'])
+
+
+def classify(residual, spec):
+    """Zone index per log2 residual, 0 below the lower band up to 4 above the upper one."""
+    edges = np.sort(np.log2([spec.minus_bias, spec.buy, spec.sell, spec.plus_bias]))
+    # on an edge counts as the zone above, as in the app's banner
+    return np.searchsorted(edges, residual, side='right')
+
+
+def crossings(previous, zones):
+    """Positions where the zone differs from the bar before, ``previous`` before the first."""
+    changed = np.empty(len(zones), dtype=bool)
+    if len(zones):
+        changed[0] = zones[0] != previous
+        changed[1:] = zones[1:] != zones[:-1]
+    return np.flatnonzero(changed)
+
+
+def meta_stamp(root, symbol):
+    # PriceStore replaces meta.json on every append, a new inode means new bars
+    try:
+        st = os.stat(os.path.join(root, symbol, 'meta.json'))
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def format_alert(alert):
+    return (f"{alert.symbol} {alert.date}: ${alert.price:,.4g} moved from {alert.previous} to {alert.zone} "
+            f"({alert.ratio:.2f}x the model's ${alert.model_price:,.4g})")
+
+
+class AlertEngine:
+    """Crossing state per ticker, advanced by ``evaluate``."""
+
+    def __init__(self, root, specs, calibration=None, state_path=None):
+        self.root = root
+        self.specs = {spec.symbol: spec for spec in specs}
+        self.calibration = calibration
+        self.state_path = state_path or os.path.join(root, 'alerts.json')
+        try:
+            with open(self.state_path, 'r') as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            self.state = {}
+        self._stamps = {}
+
+    def evaluate(self):
+        """Alerts for every zone change among the bars appended since the last call."""
+        alerts = []
+        for symbol, spec in self.specs.items():
+            stamp = meta_stamp(self.root, symbol)
+            if stamp is None or stamp == self._stamps.get(symbol):
+                continue
+            try:
+                alerts.extend(self._evaluate(symbol, spec))
+            except Exception as e:
+                print(f"Could not evaluate alerts for {symbol}: {e}")
+                continue
+            self._stamps[symbol] = stamp
+        return alerts
+
+    def _evaluate(self, symbol, spec):
+        store = PriceStore(self.root, symbol, spec.epoch, spec.offset)
+        state = self.state.get(symbol)
+        if state is not None and state['rows'] > store.rows:
+            # the store was rebuilt, start over
+            state = None
+        if store.rows == 0 or (state is not None and state['rows'] == store.rows):
+            return []
+        spec = fit_spec(spec, store, self.calibration)
+        # a ticker seen for the first time only sets its baseline from the last bar
+        start = store.rows - 1 if state is None else state['rows']
+        x = np.asarray(store.column('log2dayth')[start:])
+        model = spec.const + spec.coef * x
+        residual = store.column('log2open')[start:] - model
+        zones = classify(residual, spec)
+        self.state[symbol] = {'rows': store.rows, 'zone': ZONES[zones[-1]]}
+        if state is None:
+            return []
+        hits = crossings(ZONES.index(state['zone']), zones)
+        if not len(hits):
+            return []
+        dates = dayth_to_dates(store.column('dayth')[start:][hits], spec.epoch, spec.offset).astype(str).tolist()
+        opens = store.column('Open')[start:]
+        return [Alert(symbol, date, float(opens[i]), float(np.exp2(model[i])), float(np.exp2(residual[i])),
+                      ZONES[zones[i - 1]] if i else state['zone'], ZONES[zones[i]])
+                for date, i in zip(dates, hits)]
+
+    def save(self):
+        tmp = f'{self.state_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+
+class LogSink:
+    def send(self, alerts):
+        for alert in alerts:
+            print(format_alert(alert))
+
+
+class FileSink:
+    """Appends one JSON object per alert (JSON Lines)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alerts):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.writelines(json.dumps(alert._asdict()) + '\n' for alert in alerts)
+
+
+class WebhookSink:
+    """POSTs each batch of alerts as one JSON list, retried with backoff."""
+
+    def __init__(self, url, timeout=5, retries=3, backoff=1.0):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def send(self, alerts):
+        body = json.dumps([alert._asdict() for alert in alerts]).encode('utf-8')
+
+        def post():
+            request = urllib.request.Request(self.url, data=body, method='POST',
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status
+
+        return with_retries(post, self.retries, self.backoff)
+
+
+def sink_from_config(entry):
+    """``log``, ``file:PATH`` or ``webhook:URL``."""
+    kind, _, target = entry.partition(':')
+    if kind == 'log':
+        return LogSink()
+    if kind == 'file' and target:
+        return FileSink(target)
+    if kind == 'webhook' and target:
+        return WebhookSink(target)
+    raise ValueError(f'unknown alert sink {entry!r}')
+
+
+def run_alerts(engine, sinks, interval=60, once=False):
+    while True:
+        started = time.monotonic()
+        alerts = engine.evaluate()
+        for sink in sinks if alerts else []:
+            try:
+                sink.send(alerts)
+            except Exception as e:
+                # delivery is at most once, a failing sink does not stall the others
+                print(f"Could not deliver {len(alerts)} alerts to {type(sink).__name__}: {e}")
+        engine.save()
+        if once:
+            return alerts
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def run_alerter(specs, root, interval=60, sinks=('log',), calibration=None, once=False):
+    engine = AlertEngine(root, specs, calibration)
+    return run_alerts(engine, [sink_from_config(sink) for sink in sinks], interval, once)
+
+
+def start_alerter(specs, root, interval=60, sinks=('log',), calibration=None):
+    """Evaluate alerts in a freshly spawned process, see data_sync.start_refresher."""
+    process = multiprocessing.get_context('spawn').Process(
+        target=run_alerter, args=(list(specs), root, interval, list(sinks), calibration),
+        name='cryplot-alerts', daemon=True)
+    process.start()
+    return process
+
+
+if __name__ == '__main__':
+    from tickers import load_registry
+    parser = argparse.ArgumentParser(description='Fire alerts when new bars cross a ticker\'s buy/sell levels or bands.')
+    parser.add_argument('tickers', nargs='*', help='tickers to watch, default alerts.watchlist or every registered one')
+    parser.add_argument('--once', action='store_true', help='evaluate once and exit instead of looping')
+    parser.add_argument('--interval', type=float, help='seconds between evaluations')
+    parser.add_argument('--sink', action='append', help='log, file:PATH or webhook:URL, may be repeated')
+    args = parser.parse_args()
+    with open('configs.json', 'r') as f:
+        configs = json.load(f)
+    alert_configs = configs.get('alerts', {})
+    registry = load_registry(configs)
+    watchlist = args.tickers or alert_configs.get('watchlist') or list(registry)
+    run_alerter([registry[symbol] for symbol in watchlist], os.environ.get('CRYPLOT_STORE', configs['store_path']),
+                args.interval or alert_configs.get('interval', 60), args.sink or alert_configs.get('sinks', ['log']),
+                configs.get('calibration'), once=args.once)
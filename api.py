@@ -0,0 +1,113 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+MAX_BATCH = 100000
+
+
+def error(message, status=400):
+    return jsonify({'error': message}), status
+
+
+def batch_args():
+    # POST {"dates": [...]} / {"dayth": [...]}, or GET ?dates=a,b,c
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise ValueError('expected a JSON object with "dates" or "dayth"')
+        return body.get('ticker'), body.get('dates'), body.get('dayth')
+    dates = request.args.get('dates')
+    dayth = request.args.get('dayth')
+    return request.args.get('ticker'), (dates.split(',') if dates else None), (dayth.split(',') if dayth else None)
+
+
+def day_numbers(values):
+    # query strings arrive as text; JSON floats and booleans are not day numbers
+    if not all(isinstance(v, str) or (isinstance(v, int) and not isinstance(v, bool)) for v in values):
+        raise ValueError('dayth values must be integers')
+    try:
+        return [int(v) for v in values]
+    except ValueError:
+        raise ValueError('dayth values must be integers')
+
+
+def ticker_spec(symbol):
+    tickers = current_app.config['CRYPLOT_TICKERS']
+    return tickers.get(symbol or current_app.config['CRYPLOT_DEFAULT_TICKER'])
+
+
+@api.route('/predict', methods=['GET', 'POST'])
+def predict():
+    # NumPy is imported on first use, the app answers health checks without it
+    import numpy as np
+    from predictor import ticker_table, dates_to_dayth, dayth_to_dates
+    try:
+        symbol, dates, dayth = batch_args()
+        if (dates is None) == (dayth is None):
+            raise ValueError('pass exactly one of "dates" or "dayth"')
+        values = dates if dates is not None else dayth
+        if not isinstance(values, list) or len(values) > MAX_BATCH:
+            raise ValueError(f'expected a list of at most {MAX_BATCH} values')
+        spec = ticker_spec(symbol)
+        if spec is None:
+            return error(f'unknown ticker {symbol}', 404)
+        if dates is not None:
+            dayth = dates_to_dayth(dates, spec.epoch, spec.offset)
+        else:
+            dayth = np.asarray(day_numbers(dayth), dtype=np.int64)
+    except (TypeError, ValueError, OverflowError) as e:
+        return error(str(e))
+    if (dayth < 1).any():
+        return error('dates must not be before the first day of the model')
+
+    pred = ticker_table(spec).take(dayth)
+    result = {
+        'ticker': spec.symbol,
+        'dates': dayth_to_dates(dayth, spec.epoch, spec.offset).astype(str).tolist(),
+        'dayth': dayth.tolist(),
+    }
+    result.update({name: values.tolist() for name, values in pred.items()})
+    return jsonify(result)
+
+
+@api.route('/history')
+def history():
+    """?ticker=&start=&end=&freq=D|W|M&columns=Open,Prediction&format=json|csv|arrow"""
+    import history as hist
+    symbol = request.args.get('ticker') or current_app.config['CRYPLOT_DEFAULT_TICKER']
+    dataset = current_app.config['CRYPLOT_DATASETS'].get(symbol)
+    if dataset is None:
+        return error(f'unknown ticker {symbol}', 404)
+    fmt = request.args.get('format', 'json')
+    if fmt not in hist.FORMATS:
+        return error(f'format must be one of {", ".join(hist.FORMATS)}')
+    if fmt == 'arrow':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return error('Arrow output needs pyarrow installed', 406)
+    columns = request.args.get('columns')
+    freq = request.args.get('freq', 'D').upper()
+    try:
+        dates, values = hist.query(dataset, request.args.get('start'), request.args.get('end'), freq,
+                                   columns.split(',') if columns else None)
+    except (TypeError, ValueError) as e:
+        return error(str(e))
+    meta = {'ticker': symbol, 'freq': freq, 'rows': len(dates)}
+    return Response(hist.stream(fmt, meta, dates, values), mimetype=hist.FORMATS[fmt])
+
+
+@api.route('/scenarios')
+def scenarios():
+    """?ticker= percentile fan and band probabilities for the simulated days ahead"""
+    from scenarios import to_json
+    symbol = request.args.get('ticker') or current_app.config['CRYPLOT_DEFAULT_TICKER']
+    spec = ticker_spec(symbol)
+    if spec is None:
+        return error(f'unknown ticker {symbol}', 404)
+    dataset = current_app.config['CRYPLOT_DATASETS'][spec.symbol]
+    try:
+        result = current_app.config['CRYPLOT_SCENARIOS'].get(spec, dataset)
+    except ValueError as e:
+        return error(str(e), 422)
+    return jsonify(to_json(result))
@@ -1,274 +1,726 @@
-import pandas as pd
 import json
-import yfinance as yf
-from plotter import plotter
-from predictor import predictor
-from dash import Dash, html, dcc, Input, Output, State
-from datetime import datetime, date, timedelta
-import numpy as np
-from df_maker import df_maker
+import math
 import os
+import threading
+from startup import StartupTrace
+
+# Importing this module only builds the Dash app, enough to answer /healthz.
+# pandas, plotly and the data modules load in warm_up(), see startup.py
+trace = StartupTrace()
+with trace.importing('dash'):
+    import flask
+    from dash import (Dash, html, dcc, dash_table, Input, Output, State, ClientsideFunction, ctx, no_update,
+                      callback, clientside_callback)
+with trace.importing('metrics'):
+    import metrics
+    from api import api
+    from payload_cache import cache_layout
+    from data_sync import VersionWatcher
+
 # Load configs
 with open('configs.json', 'r') as f:
     configs = json.load(f)
 
-const = configs['const']
-coef = configs['coef']
-data_path = configs['data_path']
-df = pd.read_csv(data_path)
-# Add bias columns for old data
-df['plus_bias'] = df['Prediction'] * 1.8
-df['minus_bias'] = df['Prediction'] * 0.45
-df['log_plus_bias'] = np.log2(df['plus_bias'])
-df['log_minus_bias'] = np.log2(df['minus_bias'])
-
-date_string = '2024-07-26'
-start = datetime.strptime(date_string, '%Y-%m-%d').date()
-df_temp = df_maker(const, coef, start)
-df = pd.concat([df, df_temp], ignore_index=True)
-
-# Get latest BTC price and date
-btc_data = yf.Ticker("BTC-USD")
-latest_data = btc_data.history(period="1d")
-latest_price = latest_data['Open'].iloc[0]
-log2_latest_price = np.log2(latest_price)
-latest_date = latest_data.index[0].strftime('%Y-%m-%d')
-predict_price, log2_predict_price = predictor(const, coef, latest_date)
-buy_price = predict_price * 0.6
-sell_price = predict_price * 1.8
-
-
-# Plot data
-fig = plotter(df, 'Date', ['Open', 'Prediction', 'plus_bias', 'minus_bias'], 'BTC/USD')
-log_fig = plotter(df, 'Date', ['log2open', 'PredictedLog2Open', 'log_plus_bias', 'log_minus_bias'], 'BTC/USD (Log2)')
-tickvals = [1, 10, 100, 1000, 2000, 3000, 4000, 5000]
-ticktext = [df['Date'].iloc[i-1] for i in tickvals]
-loglog_fig = plotter(df, 'dayth', ['log2open', 'PredictedLog2Open', 'log_plus_bias', 'log_minus_bias'], 'BTC/USD (LogLog)')
-loglog_fig.update_layout(xaxis=dict(
-        type='log',
-        tickvals=tickvals,
-        ticktext=ticktext
-    ))
-
-
-app = Dash(__name__,
-           meta_tags = [{'name':'viewport',
-                       'content': 'width=device-width, initial-scale=0.1, maximum-scale=2,minimun-scale=0.1'}])
-server = app.server
+default_ticker = configs.get('default_ticker', 'BTC-USD')
+store_root = os.environ.get('CRYPLOT_STORE', configs['store_path'])
+live_configs = configs.get('live_price', {})
+intraday_configs = configs.get('intraday', {})
+screener_configs = configs.get('screener', {})
+scenario_configs = configs.get('scenarios', {})
+# Optional minute bars; when enabled their latest bar also drives the banner
+banner_interval = intraday_configs.get('interval', 15) if intraday_configs.get('enabled') else live_configs.get('interval', 60)
 
-# Custom CSS styling
-app.layout = html.Div([
-    # Header Section
-    html.Div([
-        html.Div([
-            html.H1("₿ Bitcoin Price Predictor for FUN! 🚀🚀🚀🌕", 
-                   style={
-                       'color': '#F7931A',
-                       'fontFamily': 'Segoe UI, Arial, sans-serif',
-                       'fontWeight': 'bold',
-                       'fontSize': '3rem',
-                       'marginBottom': '2rem',
-                       'textAlign': 'center'
-                   }),
-            html.Div([
-                html.Span(f"Live Price {latest_date}: ", style={'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold'}),
-                html.Span(f"${'{:,.0f}'.format(latest_price)}", 
-                         style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold'}),
-                html.Span(f" ({'{:.1f}'.format(log2_latest_price)})", 
-                         style={'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'}),
-                # if price is above buy_price, show green "BUY time", else if price is below sell_price, show red "SELL time, else show ""
-                html.Br(),
-                html.Span(f"Price too low today, BUY time?", style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'}) 
-                if latest_price < buy_price else html.Span(f"", style={'color': '#28a745', 'fontSize': '1rem', 'marginLeft': '0.5rem'}),
-                html.Br(),
-                html.Span(f"Price too high today, SELL time?", style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'}) 
-                if latest_price > sell_price else html.Span(f"", style={'color': '#dc3545', 'fontSize': '1rem', 'marginLeft': '0.5rem'}),
-                html.Br(),
-                html.Span(f"Moderate price today, Hold?", style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'})
-                if latest_price > buy_price and latest_price < sell_price else html.Span(f"", style={'color': '#dc3545', 'fontSize': '1rem', 'marginLeft': '0.5rem'}),
-                html.Br(),
-                # Warning it is not financial advice, just for fun!
-                html.Span(f"⚠️ this site is not to provide financial advice, just for fun!", style={'marginBottom': '2rem', 'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'})
-                ], style={'textAlign': 'center', 'marginBottom': '1rem'})
-        ])
-    ], style={
-        'background': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
-        'padding': '3rem 2rem',
-        'marginBottom': '2rem',
-        'borderRadius': '0 0 20px 20px',
-        'boxShadow': '0 4px 15px rgba(0,0,0,0.1)'
-    }),
-    
-    # Main Content Container
-    html.Div([
-        # Prediction Input Section
+# Filled in place by warm_up(), requests that need them wait for `ready`
+specs = {}
+registry = {}
+datasets = {}
+tickers = []
+live_prices = {}
+intraday_feeds = {}
+screener = None
+scenario_cache = None
+ready = threading.Event()
+_warm_lock = threading.Lock()
+
+# Imported one by one, dependencies first, so the trace shows what each costs
+WARM_IMPORTS = ['numpy', 'pandas', 'plotly.graph_objects', 'predictor', 'sources', 'df_maker', 'plotter']
+
+def data_version():
+    # moves whenever a bar is appended, the forecast reaches a new day or a ticker's fit changes
+    return ready.is_set(), tuple((symbol, datasets[symbol].observed, len(datasets[symbol]),
+                                  registry[symbol].const, registry[symbol].coef)
+                                 for symbol in tickers)
+
+def warm_up(refresh=True):
+    """Load every ticker and build its lookup table, figures and the layout.
+
+    Idempotent, the first caller does the work and later ones wait for it.
+    With ``refresh=False`` only the local stores are read, nothing is fetched.
+    """
+    global screener, scenario_cache
+    with _warm_lock:
+        if ready.is_set():
+            return
+        with trace.phase('imports'):
+            for name in WARM_IMPORTS:
+                trace.import_module(name)
+            from data_sync import wait_for_store
+            from df_maker import load_tickers
+            from predictor import ticker_table
+            from scenarios import ScenarioCache
+            from screener import Screener, universe_specs
+            from sources import set_default_source, source_from_config
+            from tickers import load_registry
+        with trace.phase('registry'):
+            # Yahoo by default, CRYPLOT_REPLAY_DIR replays recorded histories offline
+            set_default_source(source_from_config(configs.get('data_source')))
+            specs.update(load_registry(configs))
+            registry.update(specs)
+        # All registered tickers are loaded concurrently up front, switching between
+        # them in the app only reads these cached datasets
+        with trace.phase('load tickers'):
+            if not refresh and default_ticker in specs:
+                # on a cold start the refresher's first pass fills the stores, see data_sync.py
+                wait_for_store(store_root, default_ticker)
+            for symbol, (spec, dataset) in load_tickers(specs.values(), store_root, configs.get('fetch_workers', 4),
+                                                        refresh=refresh, calibration=configs.get('calibration')).items():
+                registry[symbol] = spec
+                datasets[symbol] = dataset
+            tickers[:] = [symbol for symbol in registry if symbol in datasets]
+            server.config['CRYPLOT_TICKERS'].update({symbol: registry[symbol] for symbol in tickers})
+            for symbol in tickers:
+                metrics.dataset_rows.set(len(datasets[symbol]), ticker=symbol)
+        with trace.phase('feeds'):
+            add_feeds(tickers)
+            # Universe ranking, computed in the background at most once per day
+            screener = Screener(store_root, universe_specs(configs),
+                                io_workers=screener_configs.get('io_workers', 4),
+                                cpu_workers=screener_configs.get('cpu_workers'),
+                                batch_size=screener_configs.get('batch_size', 50),
+                                quantiles=configs.get('calibration'))
+        with trace.phase('lookup tables'):
+            for symbol in tickers:
+                ticker_table(registry[symbol])
+        with trace.phase('figures'):
+            for symbol in tickers:
+                for kind in ('linear', 'log2', 'loglog'):
+                    overview_figure(symbol, kind)
+        with trace.phase('scenarios'):
+            # other tickers simulate on first view, each result is reused until its data moves
+            scenario_cache = ScenarioCache(**scenario_configs)
+            server.config['CRYPLOT_SCENARIOS'] = scenario_cache
+            if default_ticker in datasets:
+                overview_figure(default_ticker, 'scenarios')
+        ready.set()
+        with trace.phase('layout'):
+            server.extensions['cryplot_layout'].get()
+        trace.finish()
+        print(trace.summary())
+
+def add_feeds(symbols):
+    # Latest prices are refreshed in the background, page loads only read the cache
+    from intraday import IntradayFeed
+    from live_price import LivePriceCache
+    symbols = [symbol for symbol in symbols if symbol not in live_prices]
+    live_prices.update({symbol: LivePriceCache(symbol,
+                                               interval=live_configs.get('interval', 60),
+                                               ttl=live_configs.get('ttl', 300))
+                        for symbol in symbols})
+    if intraday_configs.get('enabled'):
+        intraday_feeds.update({symbol: IntradayFeed(symbol,
+                                                    capacity=intraday_configs.get('capacity', 1440),
+                                                    interval=intraday_configs.get('interval', 15))
+                               for symbol in symbols})
+
+def live_quote(symbol):
+    # (quote, stale) from whichever stream feeds the banner
+    feed = intraday_feeds.get(symbol)
+    if feed is not None:
+        feed.start()
+        return feed.quote(), feed.is_stale(live_configs.get('ttl', 300))
+    live_price = live_prices[symbol]
+    live_price.start()
+    return live_price.get(), live_price.is_stale()
+
+def start_background(refresh=True):
+    # threads do not survive a fork, each serving process starts its own
+    threading.Thread(target=_background, args=(refresh,), name='warm-up', daemon=True).start()
+
+def _background(refresh):
+    try:
+        # a no-op when a preloading server already warmed up before forking
+        warm_up(refresh)
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+        return
+    if default_ticker in intraday_feeds:
+        intraday_feeds[default_ticker].start()
+    else:
+        live_prices[default_ticker].start()
+
+
+# Plot data, each trace capped at max_points until the user zooms in
+max_points = configs.get('max_points', 1000)
+# Figures with more points than this are drawn with WebGL and sent as binary arrays
+webgl_threshold = configs.get('webgl_threshold', 2000)
+TICKVALS = [1, 10, 100, 1000, 2000, 3000, 4000, 5000]
+
+def make_fig(symbol, x_range=None):
+    from plotter import plotter, typed_figure
+    return typed_figure(plotter(datasets[symbol], 'Date', ['Open', 'Prediction', 'plus_bias', 'minus_bias'], registry[symbol].label,
+                                max_points=max_points, x_range=x_range, webgl_threshold=webgl_threshold))
+
+def make_log_fig(symbol, x_range=None):
+    from plotter import plotter, typed_figure
+    return typed_figure(plotter(datasets[symbol], 'Date', ['log2open', 'PredictedLog2Open', 'log_plus_bias', 'log_minus_bias'], f'{registry[symbol].label} (Log2)',
+                                max_points=max_points, x_range=x_range, webgl_threshold=webgl_threshold))
+
+def make_loglog_fig(symbol, x_range=None):
+    from plotter import plotter, typed_figure
+    from predictor import dayth_to_dates
+    spec, dataset = registry[symbol], datasets[symbol]
+    tickvals = [v for v in TICKVALS if dataset['dayth'][0] <= v <= dataset['dayth'][-1]]
+    ticktext = list(dayth_to_dates(tickvals, spec.epoch, spec.offset).astype(str))
+    loglog_fig = plotter(dataset, 'dayth', ['log2open', 'PredictedLog2Open', 'log_plus_bias', 'log_minus_bias'], f'{spec.label} (LogLog)',
+                         max_points=max_points, x_range=x_range, log_x=True, webgl_threshold=webgl_threshold)
+    loglog_fig.update_layout(xaxis=dict(
+            type='log',
+            tickvals=tickvals,
+            ticktext=ticktext
+        ))
+    return typed_figure(loglog_fig)
+
+def make_scenario_fig(symbol):
+    from plotter import fan_plotter
+    try:
+        result = scenario_cache.get(registry[symbol], datasets[symbol])
+    except ValueError as e:
+        # too little history to resample from
+        print(f"No scenarios for {symbol}: {e}")
+        return {}
+    return fan_plotter(result['dates'], result['model'], result['percentiles'],
+                       f"{registry[symbol].label}: {result['paths']:,} Simulated Paths").to_dict()
+
+def scenario_range(symbol, dayth):
+    # (low, high) percentile prices on a simulated day, None outside the horizon
+    try:
+        result = scenario_cache.get(registry[symbol], datasets[symbol])
+    except ValueError:
+        return None
+    j = int(dayth - result['dayth'][0])
+    if not 0 <= j < len(result['dayth']):
+        return None
+    qs = sorted(result['percentiles'])
+    return qs[0], qs[-1], result['percentiles'][qs[0]][j], result['percentiles'][qs[-1]][j]
+
+# Full range figures per ticker, built on first use
+overview_figures = {}
+
+def overview_figure(symbol, kind):
+    if (symbol, kind) not in overview_figures:
+        overview_figures[symbol, kind] = {'linear': make_fig, 'log2': make_log_fig, 'loglog': make_loglog_fig,
+                                          'scenarios': make_scenario_fig}[kind](symbol)
+    return overview_figures[symbol, kind]
+
+def zoom_range(relayout_data, log_x=False):
+    # Visible x range from a relayoutData event, None when zoomed back out
+    if not relayout_data:
+        return no_update
+    if relayout_data.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout_data:
+        lo, hi = relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    elif 'xaxis.range' in relayout_data:
+        lo, hi = relayout_data['xaxis.range']
+    else:
+        return no_update
+    if log_x:
+        return 10 ** lo, 10 ** hi
+    from plotter import numeric_x
+    return numeric_x([str(lo)[:10], str(hi)[:10]])
+
+def update_figure(symbol, kind, relayout_data, log_x=False):
+    if ctx.triggered_id == 'ticker-select':
+        return overview_figure(symbol, kind)
+    x_range = zoom_range(relayout_data, log_x)
+    if x_range is no_update:
+        return no_update
+    if x_range is None:
+        return overview_figure(symbol, kind)
+    return {'linear': make_fig, 'log2': make_log_fig, 'loglog': make_loglog_fig}[kind](symbol, x_range)
+
+def reload_datasets():
+    # New bars were published by the refresher, rebuild from the local store only;
+    # tickers whose stores were still empty at warm-up join here
+    from df_maker import load_tickers
+    for symbol, (spec, dataset) in load_tickers(specs.values(), store_root,
+                                                configs.get('fetch_workers', 4), refresh=False,
+                                                calibration=configs.get('calibration')).items():
+        registry[symbol] = spec
+        datasets[symbol] = dataset
+        server.config['CRYPLOT_TICKERS'][symbol] = spec
+        metrics.dataset_rows.set(len(dataset), ticker=symbol)
+    tickers[:] = [symbol for symbol in registry if symbol in datasets]
+    add_feeds(tickers)
+    overview_figures.clear()
+
+
+def live_banner(symbol, quote, stale=False):
+    if quote is None:
+        return [
+            html.Span("Live Price: loading...", style={'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold'}),
+            html.Br(),
+            # Warning it is not financial advice, just for fun!
+            html.Span(f"⚠️ this site is not to provide financial advice, just for fun!", style={'marginBottom': '2rem', 'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'})
+        ]
+    from predictor import ticker_table, dates_to_dayth
+    latest_price = quote.price
+    latest_date = quote.date
+    log2_latest_price = math.log2(latest_price)
+    spec = registry[symbol]
+    table = ticker_table(spec)
+    i = table.index(latest_date)
+    predict_price = table['price'][i] if i is not None else table.take(dates_to_dayth([latest_date], spec.epoch, spec.offset))['price'][0]
+    buy_price = predict_price * spec.buy
+    sell_price = predict_price * spec.sell
+    return [
+        html.Span(f"{'Last' if stale else 'Live'} Price {latest_date}: ", style={'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold'}),
+        html.Span(f"${'{:,.0f}'.format(latest_price)}", 
+                 style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold'}),
+        html.Span(f" ({'{:.1f}'.format(log2_latest_price)})", 
+                 style={'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'}),
+        # if price is above buy_price, show green "BUY time", else if price is below sell_price, show red "SELL time, else show ""
+        html.Br(),
+        html.Span(f"Price too low today, BUY time?", style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'}) 
+        if latest_price < buy_price else html.Span(f"", style={'color': '#28a745', 'fontSize': '1rem', 'marginLeft': '0.5rem'}),
+        html.Br(),
+        html.Span(f"Price too high today, SELL time?", style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'}) 
+        if latest_price > sell_price else html.Span(f"", style={'color': '#dc3545', 'fontSize': '1rem', 'marginLeft': '0.5rem'}),
+        html.Br(),
+        html.Span(f"Moderate price today, Hold?", style={'color': '#FAF9F6', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'})
+        if latest_price > buy_price and latest_price < sell_price else html.Span(f"", style={'color': '#dc3545', 'fontSize': '1rem', 'marginLeft': '0.5rem'}),
+        html.Br(),
+        # Warning it is not financial advice, just for fun!
+        html.Span(f"⚠️ this site is not to provide financial advice, just for fun!", style={'marginBottom': '2rem', 'color': '#F7931A', 'fontSize': '2rem', 'fontWeight': 'bold', 'marginLeft': '0.5rem'})
+    ]
+
+
+# Served with a 503 until warm_up() finishes; assets and probes never wait
+WARM_EXEMPT = ('/healthz', '/readyz', '/metrics', '/assets/', '/_dash-component-suites/', '/_dash-dependencies',
+               '/_favicon.ico')
+WARMING_PAGE = ('<!DOCTYPE html><html><head><meta http-equiv="refresh" content="2"><title>Cryplot</title></head>'
+                '<body>Warming up, this page reloads by itself...</body></html>')
+
+def create_app():
+    """The Dash app with its routes, hooks and layout, before any data is loaded.
+
+    Callbacks are registered on ``dash.callback`` below and picked up by the
+    app on its first request.
+    """
+    with trace.phase('create app'):
+        app = Dash(__name__,
+                   meta_tags = [{'name':'viewport',
+                               'content': 'width=device-width, initial-scale=0.1, maximum-scale=2,minimun-scale=0.1'}])
+        server = app.server
+
+        @server.before_request
+        def wait_for_warm_up():
+            path = flask.request.path
+            if ready.is_set() or path.startswith(WARM_EXEMPT):
+                return None
+            headers = {'Retry-After': '2'}
+            if path.startswith(('/_dash', '/api/')):
+                return flask.jsonify({'status': 'warming up'}), 503, headers
+            return flask.Response(WARMING_PAGE, status=503, mimetype='text/html', headers=headers)
+
+        @server.route('/healthz')
+        def healthz():
+            return flask.jsonify({'status': 'ok'})
+
+        @server.route('/readyz')
+        def readyz():
+            return flask.jsonify({'ready': ready.is_set(), 'startup': trace.report()}), 200 if ready.is_set() else 503
+
+        server.config['CRYPLOT_TICKERS'] = {}
+        # the same dict warm_up() and reload_datasets() fill
+        server.config['CRYPLOT_DATASETS'] = datasets
+        server.config['CRYPLOT_DEFAULT_TICKER'] = default_ticker
+        server.register_blueprint(api)
+        metrics.install(server)
+        app.layout = serve_layout
+
+        # Pick up versions published by the refresher process (see data_sync.py),
+        # registered first so a request never sees the previous version's layout
+        data_watcher = VersionWatcher(store_root, reload_datasets)
+
+        @server.before_request
+        def check_data_version():
+            if ready.is_set():
+                data_watcher.check()
+
+        # The layout only changes with the data, serve it pre-serialized and compressed
+        server.extensions['cryplot_layout'] = cache_layout(app, data_version)
+    return app
+
+def prediction_table_cache():
+    from predictor import prediction_table
+    info = prediction_table.cache_info()
+    return [({'result': 'hit'}, info.hits), ({'result': 'miss'}, info.misses)]
+
+metrics.Counter('cryplot_prediction_table_cache_total', 'prediction_table lookups by lru_cache result',
+                fn=prediction_table_cache)
+
+def intraday_section():
+    # The figure itself arrives with the first intraday-interval callback
+    if not intraday_configs.get('enabled'):
+        return []
+    return [
         html.Div([
-            html.H3("🔮 Price Prediction", 
+            html.H4("⏱️ Intraday Chart", 
                    style={
-                       'color': '#343a40',
+                       'color': '#495057',
                        'fontFamily': 'Segoe UI, Arial, sans-serif',
                        'textAlign': 'center',
-                       'marginBottom': '1.5rem'
+                       'marginBottom': '1rem'
                    }),
-            html.Div([
-                dcc.Input(
-                    id='date-input',
-                    type='text',
-                    placeholder='Enter date (YYYY-MM-DD)',
-                    value='2025-01-01',
-                    style={
-                        'padding': '12px 20px',
-                        'fontSize': '1rem',
-                        'borderRadius': '25px',
-                        'border': '2px solid #e9ecef',
-                        'marginRight': '10px',
-                        'width': '200px',
-                        'textAlign': 'center',
-                        'outline': 'none'
-                    }
-                ),
-                html.Button('Predict', 
-                           id='submit-date', 
-                           n_clicks=0,
-                           style={
-                               'padding': '12px 30px',
-                               'fontSize': '1rem',
-                               'fontWeight': 'bold',
-                               'borderRadius': '25px',
-                               'border': 'none',
-                               'background': 'linear-gradient(45deg, #F7931A, #FFB74D)',
-                               'color': 'white',
-                               'cursor': 'pointer',
-                               'boxShadow': '0 4px 15px rgba(247,147,26,0.3)',
-                               'transition': 'all 0.3s ease'
-                           })
-            ], style={'textAlign': 'center', 'marginBottom': '1rem'}),
-            html.Div(id='date-result', style={'textAlign': 'center'})
+            dcc.Graph(id='intraday-graph'),
+            dcc.Interval(id='intraday-interval', interval=intraday_configs.get('interval', 15) * 1000),
+            # symbol and last timestamp this browser has, so only newer bars are sent
+            dcc.Store(id='intraday-cursor')
         ], style={
             'background': 'white',
-            'padding': '2rem',
+            'padding': '1.5rem',
             'borderRadius': '15px',
             'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
             'marginBottom': '2rem'
-        }),
-        
-        # Charts Section
+        })
+    ]
+
+SCREENER_COLUMNS = [
+    {'name': 'Ticker', 'id': 'symbol'},
+    {'name': 'Last Bar', 'id': 'last_date'},
+    {'name': 'Price', 'id': 'price', 'type': 'numeric'},
+    {'name': 'Model', 'id': 'model_price', 'type': 'numeric'},
+    {'name': 'Price / Model', 'id': 'ratio', 'type': 'numeric'},
+    {'name': 'Band Position', 'id': 'band_position', 'type': 'numeric'},
+    {'name': 'Residual %ile', 'id': 'residual_percentile', 'type': 'numeric'},
+    {'name': 'Slope', 'id': 'coef', 'type': 'numeric'},
+    {'name': 'R²', 'id': 'r2', 'type': 'numeric'},
+]
+
+def screener_rows(rows):
+    # rounded for display, sorting still works on the numbers
+    digits = {'ratio': 2, 'band_position': 2, 'residual_percentile': 1, 'coef': 2, 'r2': 2}
+    return [{**row,
+             'price': float(f"{row['price']:.4g}"),
+             'model_price': float(f"{row['model_price']:.4g}"),
+             **{key: round(row[key], n) for key, n in digits.items()}}
+            for row in rows]
+
+def screener_section():
+    return html.Div([
+        html.H3("🔎 Power-Law Screener", 
+               style={
+                   'color': '#343a40',
+                   'fontFamily': 'Segoe UI, Arial, sans-serif',
+                   'textAlign': 'center',
+                   'marginBottom': '0.5rem'
+               }),
+        html.P("Band position 0 is the lower band, 1 the upper one; cheapest first.",
+               style={'color': '#6c757d', 'fontSize': '0.9rem', 'textAlign': 'center'}),
+        html.Div([
+            html.Button('Run Screener',
+                       id='screener-run',
+                       n_clicks=0,
+                       style={
+                           'padding': '12px 30px',
+                           'fontSize': '1rem',
+                           'fontWeight': 'bold',
+                           'borderRadius': '25px',
+                           'border': 'none',
+                           'background': 'linear-gradient(45deg, #667eea, #764ba2)',
+                           'color': 'white',
+                           'cursor': 'pointer'
+                       })
+        ], style={'textAlign': 'center', 'marginBottom': '1rem'}),
+        html.Div(id='screener-status', style={'textAlign': 'center', 'color': '#6c757d', 'marginBottom': '1rem'}),
+        dash_table.DataTable(
+            id='screener-table',
+            columns=SCREENER_COLUMNS,
+            data=[],
+            sort_action='native',
+            page_size=25,
+            style_table={'overflowX': 'auto'},
+            style_cell={'fontFamily': 'Segoe UI, Arial, sans-serif', 'padding': '6px'},
+            style_header={'fontWeight': 'bold', 'backgroundColor': '#f8f9fa'}
+        ),
+        # polls while a screen is running, in this or another worker
+        dcc.Interval(id='screener-poll', interval=2000, disabled=True, max_intervals=600)
+    ], style={
+        'background': 'white',
+        'padding': '2rem',
+        'borderRadius': '15px',
+        'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
+        'marginBottom': '2rem'
+    })
+
+def initial_figure(kind):
+    # create_app() validates the layout before any data is loaded
+    return overview_figure(default_ticker, kind) if ready.is_set() else {}
+
+# Rebuilt whenever the data version moves, see cache_layout
+def serve_layout():
+    return html.Div([
+        # Header Section
         html.Div([
-            # Chart 3: Log-Log Scale
             html.Div([
-                html.H4("📈 Log-Log Scale Chart", 
+                html.H1("₿ Bitcoin Price Predictor for FUN! 🚀🚀🚀🌕", 
                        style={
-                           'color': '#495057',
+                           'color': '#F7931A',
                            'fontFamily': 'Segoe UI, Arial, sans-serif',
-                           'textAlign': 'center',
-                           'marginBottom': '1rem'
+                           'fontWeight': 'bold',
+                           'fontSize': '3rem',
+                           'marginBottom': '2rem',
+                           'textAlign': 'center'
                        }),
-                html.Div(id='hover-info-2', 
-                        style={
-                            'textAlign': 'center',
-                            'fontSize': '1.1rem',
-                            'color': '#495057',
-                            'marginBottom': '1rem',
-                            'minHeight': '30px'
-                        }),
-                dcc.Graph(id='loglog-price-graph', figure=loglog_fig)
-            ], style={
-                'background': 'white',
-                'padding': '1.5rem',
-                'borderRadius': '15px',
-                'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
-                'marginBottom': '2rem'
-            }),
-            # Chart 1: Log2 Scale
+                html.Div(live_banner(default_ticker, live_quote(default_ticker)[0] if ready.is_set() else None), id='live-banner',
+                         style={'textAlign': 'center', 'marginBottom': '1rem'}),
+                dcc.Interval(id='live-price-interval', interval=banner_interval * 1000)
+            ])
+        ], style={
+            'background': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+            'padding': '3rem 2rem',
+            'marginBottom': '2rem',
+            'borderRadius': '0 0 20px 20px',
+            'boxShadow': '0 4px 15px rgba(0,0,0,0.1)'
+        }),
+        
+        # Main Content Container
+        html.Div([
+            # Ticker Selector
+            html.Div([
+                dcc.Dropdown(
+                    id='ticker-select',
+                    options=[{'label': registry[symbol].label, 'value': symbol} for symbol in tickers],
+                    value=default_ticker,
+                    clearable=False,
+                    style={'width': '240px', 'margin': '0 auto', 'textAlign': 'left'}
+                ),
+                # epoch/offset per ticker for the clientside hover readouts
+                dcc.Store(id='ticker-registry', data={
+                    symbol: {'epoch': str(registry[symbol].epoch), 'offset': registry[symbol].offset}
+                    for symbol in tickers
+                })
+            ], style={'marginBottom': '2rem'}),
+
+            # Prediction Input Section
             html.Div([
-                html.H4("📊 Log₂ Scale Chart", 
+                html.H3("🔮 Price Prediction", 
                        style={
-                           'color': '#495057',
+                           'color': '#343a40',
                            'fontFamily': 'Segoe UI, Arial, sans-serif',
                            'textAlign': 'center',
-                           'marginBottom': '1rem'
+                           'marginBottom': '1.5rem'
                        }),
-                html.Div(id='hover-info', 
+                html.Div([
+                    dcc.Input(
+                        id='date-input',
+                        type='text',
+                        placeholder='Enter date (YYYY-MM-DD)',
+                        value='2025-01-01',
                         style={
+                            'padding': '12px 20px',
+                            'fontSize': '1rem',
+                            'borderRadius': '25px',
+                            'border': '2px solid #e9ecef',
+                            'marginRight': '10px',
+                            'width': '200px',
                             'textAlign': 'center',
-                            'fontSize': '1.1rem',
-                            'color': '#495057',
-                            'marginBottom': '1rem',
-                            'minHeight': '30px'
-                        }),
-                dcc.Graph(id='log2-price-graph', figure=log_fig)
+                            'outline': 'none'
+                        }
+                    ),
+                    html.Button('Predict', 
+                               id='submit-date', 
+                               n_clicks=0,
+                               style={
+                                   'padding': '12px 30px',
+                                   'fontSize': '1rem',
+                                   'fontWeight': 'bold',
+                                   'borderRadius': '25px',
+                                   'border': 'none',
+                                   'background': 'linear-gradient(45deg, #F7931A, #FFB74D)',
+                                   'color': 'white',
+                                   'cursor': 'pointer',
+                                   'boxShadow': '0 4px 15px rgba(247,147,26,0.3)',
+                                   'transition': 'all 0.3s ease'
+                               })
+                ], style={'textAlign': 'center', 'marginBottom': '1rem'}),
+                html.Div(id='date-result', style={'textAlign': 'center'})
             ], style={
                 'background': 'white',
-                'padding': '1.5rem',
+                'padding': '2rem',
                 'borderRadius': '15px',
                 'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
                 'marginBottom': '2rem'
             }),
             
-            # Chart 2: Linear Scale  
-            html.Div([
-                html.H4("📈 Linear Scale Chart", 
-                       style={
-                           'color': '#495057',
-                           'fontFamily': 'Segoe UI, Arial, sans-serif',
-                           'textAlign': 'center',
-                           'marginBottom': '1rem'
-                       }),
-                html.Div(id='hover-info-1', 
-                        style={
-                            'textAlign': 'center',
-                            'fontSize': '1.1rem',
-                            'color': '#495057',
-                            'marginBottom': '1rem',
-                            'minHeight': '30px'
-                        }),
-                dcc.Graph(id='price-graph', figure=fig)
-            ], style={
-                'background': 'white',
-                'padding': '1.5rem',
-                'borderRadius': '15px',
-                'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
-                'marginBottom': '2rem'
-            })
-        ])
-    ], style={
-        'maxWidth': '1200px',
-        'margin': '0 auto',
-        'padding': '0 1rem'
-    }),
-    
-    # Footer
-    html.Div([
-        html.P("Made for fun by DL LIU🤩, not for financial advice! Dash & Plotly | Data from Yahoo Finance", 
-               style={
-                   'textAlign': 'center',
-                   'color': '#6c757d',
-                   'fontSize': '0.9rem',
-                   'margin': '0'
-               })
+            # Charts Section
+            html.Div(intraday_section() + [
+                # Chart 3: Log-Log Scale
+                html.Div([
+                    html.H4("📈 Log-Log Scale Chart", 
+                           style={
+                               'color': '#495057',
+                               'fontFamily': 'Segoe UI, Arial, sans-serif',
+                               'textAlign': 'center',
+                               'marginBottom': '1rem'
+                           }),
+                    html.Div(id='hover-info-2', 
+                            style={
+                                'textAlign': 'center',
+                                'fontSize': '1.1rem',
+                                'color': '#495057',
+                                'marginBottom': '1rem',
+                                'minHeight': '30px'
+                            }),
+                    dcc.Graph(id='loglog-price-graph', figure=initial_figure('loglog'))
+                ], style={
+                    'background': 'white',
+                    'padding': '1.5rem',
+                    'borderRadius': '15px',
+                    'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
+                    'marginBottom': '2rem'
+                }),
+                # Chart 1: Log2 Scale
+                html.Div([
+                    html.H4("📊 Log₂ Scale Chart", 
+                           style={
+                               'color': '#495057',
+                               'fontFamily': 'Segoe UI, Arial, sans-serif',
+                               'textAlign': 'center',
+                               'marginBottom': '1rem'
+                           }),
+                    html.Div(id='hover-info', 
+                            style={
+                                'textAlign': 'center',
+                                'fontSize': '1.1rem',
+                                'color': '#495057',
+                                'marginBottom': '1rem',
+                                'minHeight': '30px'
+                            }),
+                    dcc.Graph(id='log2-price-graph', figure=initial_figure('log2'))
+                ], style={
+                    'background': 'white',
+                    'padding': '1.5rem',
+                    'borderRadius': '15px',
+                    'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
+                    'marginBottom': '2rem'
+                }),
+                
+                # Chart 2: Linear Scale  
+                html.Div([
+                    html.H4("📈 Linear Scale Chart", 
+                           style={
+                               'color': '#495057',
+                               'fontFamily': 'Segoe UI, Arial, sans-serif',
+                               'textAlign': 'center',
+                               'marginBottom': '1rem'
+                           }),
+                    html.Div(id='hover-info-1', 
+                            style={
+                                'textAlign': 'center',
+                                'fontSize': '1.1rem',
+                                'color': '#495057',
+                                'marginBottom': '1rem',
+                                'minHeight': '30px'
+                            }),
+                    dcc.Graph(id='price-graph', figure=initial_figure('linear'))
+                ], style={
+                    'background': 'white',
+                    'padding': '1.5rem',
+                    'borderRadius': '15px',
+                    'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
+                    'marginBottom': '2rem'
+                }),
+
+                # Chart 4: Simulated paths
+                html.Div([
+                    html.H4("🎲 Price Scenarios", 
+                           style={
+                               'color': '#495057',
+                               'fontFamily': 'Segoe UI, Arial, sans-serif',
+                               'textAlign': 'center',
+                               'marginBottom': '0.5rem'
+                           }),
+                    html.P("Residuals around the model resampled from history; shaded bands hold 50% and 90% of the paths.",
+                           style={'color': '#6c757d', 'fontSize': '0.9rem', 'textAlign': 'center'}),
+                    dcc.Graph(id='scenario-graph', figure=initial_figure('scenarios'))
+                ], style={
+                    'background': 'white',
+                    'padding': '1.5rem',
+                    'borderRadius': '15px',
+                    'boxShadow': '0 4px 15px rgba(0,0,0,0.1)',
+                    'marginBottom': '2rem'
+                })
+            ]),
+
+            # Screener Section
+            screener_section()
+        ], style={
+            'maxWidth': '1200px',
+            'margin': '0 auto',
+            'padding': '0 1rem'
+        }),
+        
+        # Footer
+        html.Div([
+            html.P("Made for fun by DL LIU🤩, not for financial advice! Dash & Plotly | Data from Yahoo Finance", 
+                   style={
+                       'textAlign': 'center',
+                       'color': '#6c757d',
+                       'fontSize': '0.9rem',
+                       'margin': '0'
+                   })
+        ], style={
+            'background': '#f8f9fa',
+            'padding': '1rem',
+            'marginTop': '3rem'
+        })
     ], style={
-        'background': '#f8f9fa',
-        'padding': '1rem',
-        'marginTop': '3rem'
+        'fontFamily': 'Segoe UI, Arial, sans-serif',
+        'backgroundColor': '#f8f9fa',
+        'minHeight': '100vh',
+        'margin': '0',
+        'padding': '0'
     })
-], style={
-    'fontFamily': 'Segoe UI, Arial, sans-serif',
-    'backgroundColor': '#f8f9fa',
-    'minHeight': '100vh',
-    'margin': '0',
-    'padding': '0'
-})
-
-@app.callback(
+
+app = create_app()
+server = app.server
+
+@callback(
+    Output('live-banner', 'children'),
+    Input('live-price-interval', 'n_intervals'),
+    Input('ticker-select', 'value')
+)
+@metrics.time_callback
+def update_live_banner(n_intervals, symbol):
+    quote, stale = live_quote(symbol)
+    return live_banner(symbol, quote, stale)
+
+@callback(
     Output('date-result', 'children'),
     Input('submit-date', 'n_clicks'),
-    State('date-input', 'value')
+    State('date-input', 'value'),
+    State('ticker-select', 'value')
 )
-def update_date_result(n_clicks, date_text):
+@metrics.time_callback
+def update_date_result(n_clicks, date_text, symbol):
     if n_clicks == 0:
         return html.Div()
+    from predictor import ticker_table
+    table = ticker_table(registry[symbol])
     try:
-        price_pred, log2_pred = predictor(const, coef, date_text)
+        i = table.index(date_text)
     except ValueError:
         return html.Div([
             html.Div("⚠️ Invalid Date Format", 
@@ -282,10 +734,7 @@ def update_date_result(n_clicks, date_text):
                   style={'color': '#6c757d', 'fontSize': '0.9rem'})
         ])
     
-    max_date = date(2060, 7, 19)
-    min_date = date(2010, 7, 19)
-    date_object = datetime.strptime(date_text, '%Y-%m-%d').date()
-    if date_object > max_date or date_object < min_date:
+    if i is None:
         return html.Div([
             html.Div("⚠️ Date Out of Range", 
                     style={
@@ -294,10 +743,13 @@ def update_date_result(n_clicks, date_text):
                         'fontWeight': 'bold',
                         'marginBottom': '0.5rem'
                     }),
-            html.P('Please enter a date between 2010-07-19 and 2060-07-19',
+            html.P(f'Please enter a date between {table.start} and {table.end}',
                   style={'color': '#6c757d', 'fontSize': '0.9rem'})
         ])
 
+    price_pred, log2_pred = table['price'][i], table['log2_price'][i]
+    scenario = scenario_range(symbol, table.first_dayth + i)
+
     return html.Div([
         html.Div([
             html.Div("🎯 Prediction Result", 
@@ -320,7 +772,12 @@ def update_date_result(n_clicks, date_text):
                              'fontSize': '1rem',
                              'color': '#6c757d'
                          }),
-                html.Br()
+                html.Br(),
+                html.Span(f"Scenario range ({scenario[0]}–{scenario[1]}%): ${scenario[2]:,.0f} – ${scenario[3]:,.0f}",
+                         style={
+                             'fontSize': '1rem',
+                             'color': '#6c757d'
+                         }) if scenario else None
             ])
         ], style={
             'background': 'linear-gradient(135deg, #d4edda, #c3e6cb)',
@@ -331,134 +788,116 @@ def update_date_result(n_clicks, date_text):
         })
     ])
 
-@app.callback(
+@callback(
+    Output('price-graph', 'figure'),
+    Input('ticker-select', 'value'),
+    Input('price-graph', 'relayoutData'),
+    prevent_initial_call=True
+)
+@metrics.time_callback
+def update_price_graph(symbol, relayout_data):
+    return update_figure(symbol, 'linear', relayout_data)
+
+@callback(
+    Output('log2-price-graph', 'figure'),
+    Input('ticker-select', 'value'),
+    Input('log2-price-graph', 'relayoutData'),
+    prevent_initial_call=True
+)
+@metrics.time_callback
+def update_log2_price_graph(symbol, relayout_data):
+    return update_figure(symbol, 'log2', relayout_data)
+
+@callback(
+    Output('loglog-price-graph', 'figure'),
+    Input('ticker-select', 'value'),
+    Input('loglog-price-graph', 'relayoutData'),
+    prevent_initial_call=True
+)
+@metrics.time_callback
+def update_loglog_price_graph(symbol, relayout_data):
+    return update_figure(symbol, 'loglog', relayout_data, log_x=True)
+
+@callback(
+    Output('scenario-graph', 'figure'),
+    Input('ticker-select', 'value'),
+    prevent_initial_call=True
+)
+@metrics.time_callback
+def update_scenario_graph(symbol):
+    return overview_figure(symbol, 'scenarios')
+
+@callback(
+    Output('screener-table', 'data'),
+    Output('screener-status', 'children'),
+    Output('screener-poll', 'disabled'),
+    Input('screener-run', 'n_clicks'),
+    Input('screener-poll', 'n_intervals')
+)
+@metrics.time_callback
+def update_screener(n_clicks, n_intervals):
+    if ctx.triggered_id == 'screener-run':
+        screener.start()
+    result = screener.cached()
+    if result is not None:
+        return (screener_rows(result['rows']),
+                f"{len(result['rows'])} tickers screened for {result['day']} in {result['seconds']:.1f}s", True)
+    if screener.error:
+        return no_update, f"Screener failed: {screener.error}", True
+    if screener.running() or ctx.triggered_id is not None:
+        return no_update, "Fetching and fitting the universe...", False
+    return [], "Run the screener to rank today's universe.", True
+
+if intraday_configs.get('enabled'):
+    @callback(
+        Output('intraday-graph', 'figure'),
+        Output('intraday-graph', 'extendData'),
+        Output('intraday-cursor', 'data'),
+        Input('intraday-interval', 'n_intervals'),
+        Input('ticker-select', 'value'),
+        State('intraday-cursor', 'data')
+    )
+    @metrics.time_callback
+    def update_intraday_graph(n_intervals, symbol, cursor):
+        from plotter import intraday_plotter
+        feed = intraday_feeds[symbol]
+        feed.start()
+        if not cursor or cursor['symbol'] != symbol:
+            # new page or ticker: send the whole buffer once
+            points = feed.buffer.since()
+            last = int(points['ts'][-1]) if len(points['ts']) else None
+            return (intraday_plotter(points['ts'], points['price'], f'{registry[symbol].label} (1m)'),
+                    no_update, {'symbol': symbol, 'ts': last})
+        points = feed.buffer.since(cursor['ts'])
+        if not len(points['ts']):
+            return no_update, no_update, no_update
+        # only the new bars, the browser drops the oldest past the buffer size
+        extend = [{'x': [points['ts'].tolist()], 'y': [points['price'].tolist()]}, [0], feed.buffer.capacity]
+        return no_update, extend, {'symbol': symbol, 'ts': int(points['ts'][-1])}
+
+# Hover readouts are formatted in the browser, see assets/hover.js
+clientside_callback(
+    ClientsideFunction(namespace='cryplot', function_name='hoverLog2'),
     Output('hover-info', 'children'),
     Input('log2-price-graph', 'hoverData'),
 )
-def display_hover_info(hoverData):
-    if hoverData is None:
-        return ""
-    
-    # Extracting information from hoverData
-    points = hoverData['points']
-    x_value = points[0]['x']
-    price_curve_0 = None
-    price_curve_1 = None
-    price_curve_2 = None
-    price_curve_3 = None
-
-    # Loop through points to find prices for curveNumber 0 and 1
-    for point in points:
-        curve_number = point['curveNumber']
-        y_value = point['y']
-        if curve_number == 0:
-            price_curve_0 = y_value  # Price for curveNumber 0
-        elif curve_number == 1:
-            price_curve_1 = y_value  # Price for curveNumber 1
-        elif curve_number == 2:
-            price_curve_2 = y_value  # Price for curveNumber 2
-        elif curve_number == 3:
-            price_curve_3 = y_value  # Price for curveNumber 3
-
-    # Create styled hover info
-    return html.Div([
-        html.Span(f"{x_value}: ", style={'color': '#495057', 'fontWeight': 'bold'}),
-        html.Span(f"{price_curve_0:.1f}" if price_curve_0 is not None else "", style={'color': '#F7931A', 'fontWeight': 'bold'}),
-        html.Span(f" (pred: {price_curve_1:.1f})" if price_curve_1 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'}),
-        html.Span(f" (plus bias: {price_curve_2:.1f})" if price_curve_2 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'}),
-        html.Span(f" (minus bias: {price_curve_3:.1f})" if price_curve_3 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'})
-    ])
-
-@app.callback(
+clientside_callback(
+    ClientsideFunction(namespace='cryplot', function_name='hoverLinear'),
     Output('hover-info-1', 'children'),
     Input('price-graph', 'hoverData'),
 )
-def display_hover_info_1(hoverData):
-    if hoverData is None:
-        return ""
-    
-    # Extracting information from hoverData
-    points = hoverData['points']
-    x_value = points[0]['x']
-    price_curve_0 = None
-    price_curve_1 = None
-    price_curve_2 = None
-    price_curve_3 = None
-
-    # Loop through points to find prices for curveNumber 0 and 1
-    for point in points:
-        curve_number = point['curveNumber']
-        y_value = point['y']
-        if curve_number == 0:
-            price_curve_0 = y_value  # Price for curveNumber 0
-        elif curve_number == 1:
-            price_curve_1 = y_value  # Price for curveNumber 1
-        elif curve_number == 2:
-            price_curve_2 = y_value  # Price for curveNumber 2
-        elif curve_number == 3:
-            price_curve_3 = y_value  # Price for curveNumber 3
-
-    # Create styled hover info
-    return html.Div([
-        html.Span(f"{x_value}: ", style={'color': '#495057', 'fontWeight': 'bold'}),
-        html.Span(f"${price_curve_0:,.0f}" if price_curve_0 is not None else "", style={'color': '#F7931A', 'fontWeight': 'bold'}),
-        html.Span(f" (pred: ${price_curve_1:,.0f})" if price_curve_1 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'}),
-        html.Span(f" (plus bias: ${price_curve_2:,.0f})" if price_curve_2 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'}),
-        html.Span(f" (minus bias: ${price_curve_3:,.0f})" if price_curve_3 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'})
-    ])
-
-@app.callback(
+clientside_callback(
+    ClientsideFunction(namespace='cryplot', function_name='hoverLogLog'),
     Output('hover-info-2', 'children'),
     Input('loglog-price-graph', 'hoverData'),
+    State('ticker-select', 'value'),
+    State('ticker-registry', 'data'),
 )
-def display_hover_info_2(hoverData):
-    if hoverData is None:
-        return ""
-    
-    # Extracting information from hoverData
-    points = hoverData['points']
-    start_date = date(2010, 7, 19)
-    x_value = points[0]['x']
-    x_value = (start_date + timedelta(days=x_value - 561)).strftime('%Y-%m-%d')
-    price_curve_0 = None
-    price_curve_1 = None
-    price_curve_2 = None
-    price_curve_3 = None
-
-    # Loop through points to find prices for curveNumber 0 and 1
-    for point in points:
-        curve_number = point['curveNumber']
-        y_value = point['y']
-        if curve_number == 0:
-            price_curve_0 = y_value  # Price for curveNumber 0
-        elif curve_number == 1:
-            price_curve_1 = y_value  # Price for curveNumber 1
-        elif curve_number == 2:
-            price_curve_2 = y_value  # Price for curveNumber 2
-        elif curve_number == 3:
-            price_curve_3 = y_value  # Price for curveNumber 3
-
-    # Create styled hover info
-    return html.Div([
-        html.Span(f"{x_value}: ", style={'color': '#495057', 'fontWeight': 'bold'}),
-        html.Span(f"{price_curve_0:.1f}" if price_curve_0 is not None else "", style={'color': '#F7931A', 'fontWeight': 'bold'}),
-        html.Span(f" (pred: {price_curve_1:.1f})" if price_curve_1 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'}),
-        html.Span(f" (plus bias: {price_curve_2:.1f})" if price_curve_2 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'}),
-        html.Span(f" (minus bias: {price_curve_3:.1f})" if price_curve_3 is not None else "", 
-                 style={'color': '#667eea', 'fontWeight': '500'})
-    ])
 
 
 # Run the app
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 8050))
+    start_background()
     # Run the app
     app.run_server(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
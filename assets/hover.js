@@ -0,0 +1,61 @@
+// Hover readouts for the three charts, formatted in the browser so hovering
+// never sends a request to the server.
+(function () {
+    var DAY_MS = 24 * 60 * 60 * 1000;
+    var LABELS = ['', ' (pred: ', ' (plus bias: ', ' (minus bias: '];
+
+    function span(text, style) {
+        return {namespace: 'dash_html_components', type: 'Span', props: {children: text, style: style}};
+    }
+
+    function dollars(value) {
+        return '$' + value.toLocaleString('en-US', {maximumFractionDigits: 0});
+    }
+
+    function log2(value) {
+        return value.toFixed(1);
+    }
+
+    // dayth is `offset` on the ticker's epoch date, see tickers.py
+    function daythToDate(dayth, ticker) {
+        var epochMs = Date.parse(ticker.epoch + 'T00:00:00Z');
+        return new Date(epochMs + (dayth - ticker.offset) * DAY_MS).toISOString().slice(0, 10);
+    }
+
+    function formatHover(hoverData, formatValue, formatX) {
+        if (!hoverData) {
+            return '';
+        }
+        var points = hoverData.points;
+        var x = formatX ? formatX(points[0].x) : points[0].x;
+        var curves = [null, null, null, null];
+        points.forEach(function (point) {
+            if (point.curveNumber < curves.length) {
+                curves[point.curveNumber] = point.y;
+            }
+        });
+        var children = [span(x + ': ', {color: '#495057', fontWeight: 'bold'})];
+        curves.forEach(function (y, i) {
+            var text = y === null ? '' : LABELS[i] + formatValue(y) + (i > 0 ? ')' : '');
+            var style = i === 0 ? {color: '#F7931A', fontWeight: 'bold'} : {color: '#667eea', fontWeight: '500'};
+            children.push(span(text, style));
+        });
+        return {namespace: 'dash_html_components', type: 'Div', props: {children: children}};
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        cryplot: {
+            hoverLinear: function (hoverData) {
+                return formatHover(hoverData, dollars);
+            },
+            hoverLog2: function (hoverData) {
+                return formatHover(hoverData, log2);
+            },
+            hoverLogLog: function (hoverData, symbol, registry) {
+                return formatHover(hoverData, log2, function (dayth) {
+                    return daythToDate(dayth, registry[symbol]);
+                });
+            }
+        }
+    });
+})();
@@ -0,0 +1,196 @@
+"""Walk-forward backtest of the power-law fit, its bands and buy/sell levels.
+
+Every training window, expanding from the first bar or rolling over the last
+``window`` days, is fitted from prefix sums of the regression terms. That
+means one O(n) pass per ticker instead of one least-squares fit per day.
+Each fit predicts the bar ``horizon`` days after its window, so every error
+is out of sample.
+
+    python backtest.py [TICKER ...] [--window 1460] [--horizons 1,30,365] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import numpy as np
+
+HORIZONS = (1, 30, 365)
+WINDOW = 4 * 365
+MIN_OBS = 365
+SIGNAL_HORIZON = 365
+
+
+def prefix_sums(x, y):
+    """Cumulative n, sx, sy, sxy, sxx over finite pairs, x centred for precision.
+
+    Row k holds the sums over the first k bars, so window [lo, hi) is S[hi] - S[lo].
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(x) & np.isfinite(y)
+    x0 = x[ok].mean() if ok.any() else 0.0
+    xc = np.where(ok, x - x0, 0.0)
+    yc = np.where(ok, y, 0.0)
+    terms = np.column_stack([ok, xc, yc, xc * yc, xc * xc])
+    sums = np.zeros((len(x) + 1, 5))
+    np.cumsum(terms, axis=0, out=sums[1:])
+    return sums, x0
+
+
+def window_fits(sums, x0, lo, hi, min_obs=2):
+    """(const, coef, n) per window [lo, hi), NaN where too few bars to fit."""
+    n, sx, sy, sxy, sxx = (sums[hi] - sums[lo]).T
+    denom = n * sxx - sx ** 2
+    valid = (n >= max(min_obs, 2)) & (denom > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coef = np.where(valid, (n * sxy - sx * sy) / denom, np.nan)
+        const = np.where(valid, (sy - coef * sx) / n, np.nan) - coef * x0
+    return const, coef, n
+
+
+def walk_forward(dayth, x, y, horizon=1, window=None, min_obs=MIN_OBS, sums=None):
+    """Out-of-sample predictions of y, ``horizon`` days past each training window.
+
+    ``window=None`` expands from the first bar, otherwise only the last
+    ``window`` days are used. Returns arrays keyed by name, one entry per
+    window that could be fitted and has a target bar.
+    """
+    dayth = np.asarray(dayth)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if sums is None:
+        sums = prefix_sums(x, y)
+    sums, x0 = sums
+    hi = np.arange(1, len(dayth) + 1)
+    last = dayth[hi - 1]
+    target = np.searchsorted(dayth, last + horizon)
+    lo = np.zeros_like(hi) if window is None else np.searchsorted(dayth, last - window + 1)
+    keep = target < len(dayth)
+    hi, lo, target = hi[keep], lo[keep], target[keep]
+    const, coef, _ = window_fits(sums, x0, lo, hi, min_obs)
+    keep = np.isfinite(coef) & np.isfinite(y[target])
+    const, coef, target, hi = const[keep], coef[keep], target[keep], hi[keep]
+    predicted = const + coef * x[target]
+    return {
+        'end': hi,
+        'target': target,
+        'const': const,
+        'coef': coef,
+        'predicted': predicted,
+        'residual': y[target] - predicted,
+    }
+
+
+def score(residual, plus_bias, minus_bias):
+    """Error in log2 units and how often the price sits inside or outside the bands."""
+    r = np.asarray(residual, dtype=np.float64)
+    if len(r) == 0:
+        return {'n': 0}
+    upper, lower = np.log2(plus_bias), np.log2(minus_bias)
+    return {
+        'n': int(len(r)),
+        'bias_log2': float(r.mean()),
+        'mae_log2': float(np.abs(r).mean()),
+        'rmse_log2': float(np.sqrt((r ** 2).mean())),
+        'median_abs_pct_error': float(np.median(np.abs(np.exp2(r) - 1)) * 100),
+        'inside_band': float(((r >= lower) & (r <= upper)).mean()),
+        'above_band': float((r > upper).mean()),
+        'below_band': float((r < lower).mean()),
+    }
+
+
+def signal_returns(dayth, y, target, residual, buy, sell, horizon=SIGNAL_HORIZON):
+    """Forward log2 returns after days priced under ``buy`` or over ``sell`` times the model.
+
+    Signals use the one-day-ahead out-of-sample residual, i.e. only data a
+    trader would have had on that day.
+    """
+    later = np.searchsorted(dayth, dayth[target] + horizon)
+    has_future = later < len(dayth)
+    start, later, residual = target[has_future], later[has_future], residual[has_future]
+    forward = y[later] - y[start]
+    signals = {
+        'buy': residual < np.log2(buy),
+        'sell': residual > np.log2(sell),
+        'all': np.ones(len(residual), dtype=bool),
+    }
+    out = {}
+    for name, mask in signals.items():
+        returns = forward[mask]
+        out[name] = {
+            'days': int(mask.sum()),
+            'share_of_days': float(mask.mean()) if len(mask) else 0.0,
+            'mean_forward_log2': float(returns.mean()) if len(returns) else None,
+            'share_up': float((returns > 0).mean()) if len(returns) else None,
+        }
+    return out
+
+
+def backtest(dayth, x, y, plus_bias, minus_bias, buy, sell, horizons=HORIZONS, window=WINDOW,
+             min_obs=MIN_OBS, signal_horizon=SIGNAL_HORIZON):
+    sums = prefix_sums(x, y)
+    report = {'bars': int(len(dayth)), 'expanding': {}, f'rolling_{window}d': {}}
+    for horizon in horizons:
+        for name, win in (('expanding', None), (f'rolling_{window}d', window)):
+            wf = walk_forward(dayth, x, y, horizon, win, min_obs, sums)
+            report[name][f'{horizon}d'] = score(wf['residual'], plus_bias, minus_bias)
+    daily = walk_forward(dayth, x, y, 1, None, min_obs, sums)
+    report['signals'] = signal_returns(np.asarray(dayth), np.asarray(y, dtype=np.float64), daily['target'],
+                                       daily['residual'], buy, sell, signal_horizon)
+    const, coef, _ = window_fits(sums[0], sums[1], np.array([0]), np.array([len(dayth)]))
+    report['fit'] = {'const': float(const[0]), 'coef': float(coef[0])}
+    return report
+
+
+def backtest_store(store, spec, **kwargs):
+    report = backtest(store.column('dayth'), store.column('log2dayth'), store.column('log2open'),
+                      spec.plus_bias, spec.minus_bias, spec.buy, spec.sell, **kwargs)
+    report['symbol'] = spec.symbol
+    return report
+
+
+def summary_lines(report):
+    lines = [f"{report['symbol']}: {report['bars']} bars, fit const={report['fit']['const']:.3f} coef={report['fit']['coef']:.3f}"]
+    for mode in [key for key in report if key == 'expanding' or key.startswith('rolling_')]:
+        for horizon, s in report[mode].items():
+            if not s['n']:
+                continue
+            lines.append(f"  {mode:>15} {horizon:>5}  mae={s['mae_log2']:.3f} bias={s['bias_log2']:+.3f} "
+                         f"mdape={s['median_abs_pct_error']:.1f}%  inside={s['inside_band']:.1%} "
+                         f"above={s['above_band']:.1%} below={s['below_band']:.1%}")
+    for name, s in report['signals'].items():
+        if s['days']:
+            lines.append(f"  {name:>15} signal  days={s['days']} ({s['share_of_days']:.1%})  "
+                         f"fwd log2={s['mean_forward_log2']:+.2f} up={s['share_up']:.1%}")
+    return lines
+
+
+if __name__ == '__main__':
+    from price_store import PriceStore
+    from tickers import load_registry, calibrate
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of the power-law fit per ticker store.')
+    parser.add_argument('tickers', nargs='*', help='tickers to test, default every registered one')
+    parser.add_argument('--window', type=int, default=WINDOW, help='rolling window in days')
+    parser.add_argument('--horizons', default=','.join(map(str, HORIZONS)), help='days ahead to predict, comma separated')
+    parser.add_argument('--min-obs', type=int, default=MIN_OBS, help='bars a window needs before it is fitted')
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    args = parser.parse_args()
+    with open('configs.json', 'r') as f:
+        configs = json.load(f)
+    registry = load_registry(configs)
+    root = os.environ.get('CRYPLOT_STORE', configs['store_path'])
+    reports = []
+    for symbol in args.tickers or list(registry):
+        spec = registry[symbol]
+        store = PriceStore(root, symbol, spec.epoch, spec.offset)
+        if store.rows == 0:
+            print(f"{symbol}: empty store, skipped", file=sys.stderr)
+            continue
+        spec = calibrate(spec, store, configs.get('calibration'))
+        reports.append(backtest_store(store, spec, horizons=[int(h) for h in args.horizons.split(',')],
+                                      window=args.window, min_obs=args.min_obs))
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print('\n'.join(summary_lines(report)))
@@ -0,0 +1,264 @@
+"""Offline benchmarks for the data, prediction, plotting and callback paths.
+
+Yahoo Finance (through a ReplaySource) and the legacy CSV download are
+replaced by local fixtures, so the numbers are repeatable and need no network:
+
+    python benchmark.py --scales 1,2,5,10 --output bench.json
+
+``--record DIR`` saves real histories from Yahoo once, ``--fixtures DIR``
+replays them. Without recordings a deterministic synthetic power-law series
+is used. Every scale runs in a fresh subprocess so cold start and peak RSS
+are measured from a clean interpreter. Hover readouts run in the browser
+(assets/hover.js) and have no server path to measure.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+LEGACY_END = '2024-07-25'
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'n': len(samples),
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+# Fixtures
+
+def fixture_history(spec, fixtures_dir, scale, seed=0):
+    """Daily Open prices for a ticker, ``scale`` times the recorded length.
+
+    Longer series keep the power-law trend and tile the recorded residuals
+    past today, so every scale has realistic noise.
+    """
+    from predictor import dates_to_dayth, dayth_to_dates
+    recorded = os.path.join(fixtures_dir, spec.symbol + '.csv') if fixtures_dir else None
+    if recorded and os.path.exists(recorded):
+        base = pd.read_csv(recorded)
+        dates = np.asarray(base['Date'], dtype='datetime64[D]')
+        opens = base['Open'].to_numpy(dtype=np.float64)
+    else:
+        dates = np.arange(spec.epoch, np.datetime64('today', 'D') + 1)
+        rng = np.random.default_rng(seed)
+        dayth = dates_to_dayth(dates, spec.epoch, spec.offset)
+        residuals = np.cumsum(rng.normal(0, 0.05, len(dates)))
+        residuals -= np.convolve(residuals, np.ones(365) / 365, mode='same')
+        opens = np.exp2(5.6 * np.log2(dayth) - 54.5 + residuals)
+
+    dayth = dates_to_dayth(dates, spec.epoch, spec.offset)
+    ok = np.isfinite(opens) & (opens > 0)
+    dayth, opens = dayth[ok], opens[ok]
+    if scale > 1:
+        x, y = np.log2(dayth), np.log2(opens)
+        coef, const = np.polyfit(x, y, 1)
+        residuals = y - (coef * x + const)
+        n = len(dayth) * scale
+        dayth = np.arange(dayth[0], dayth[0] + n)
+        opens = np.exp2(coef * np.log2(dayth) + const + np.resize(residuals, n))
+    index = pd.DatetimeIndex(dayth_to_dates(dayth, spec.epoch, spec.offset), name='Date').tz_localize('UTC')
+    return pd.DataFrame({'Open': opens, 'High': opens, 'Low': opens, 'Close': opens, 'Volume': 0}, index=index)
+
+
+def record(fixtures_dir):
+    from sources import YFinanceSource
+    from tickers import load_registry
+    with open(os.path.join(REPO, 'configs.json'), 'r') as f:
+        registry = load_registry(json.load(f))
+    os.makedirs(fixtures_dir, exist_ok=True)
+    histories = YFinanceSource().history_many({spec.symbol: spec.epoch.item() for spec in registry.values()})
+    for symbol, data in histories.items():
+        write_history(data, os.path.join(fixtures_dir, symbol + '.csv'))
+        print(f"recorded {symbol}: {len(data)} rows")
+
+
+def write_history(data, path):
+    pd.DataFrame({'Date': data.index.date.astype(str), 'Open': data['Open'].values}).to_csv(path, index=False)
+
+
+def prepare_workdir(workdir, fixtures_dir, scale):
+    """configs.json pointing at a local legacy CSV, replayed histories and an empty store."""
+    from tickers import load_registry
+    with open(os.path.join(REPO, 'configs.json'), 'r') as f:
+        configs = json.load(f)
+    registry = load_registry(configs)
+    configs['store_path'] = os.path.join(workdir, 'data')
+    configs['data_source'] = {'replay_dir': os.path.join(workdir, 'replay')}
+    os.makedirs(configs['data_source']['replay_dir'])
+    for symbol, entry in configs['tickers'].items():
+        history = fixture_history(registry[symbol], fixtures_dir, scale)
+        write_history(history, os.path.join(configs['data_source']['replay_dir'], symbol + '.csv'))
+        if entry.get('data_path'):
+            entry['data_path'] = os.path.join(workdir, symbol + '-legacy.csv')
+            write_history(history[history.index <= pd.Timestamp(LEGACY_END, tz='UTC')], entry['data_path'])
+    with open(os.path.join(workdir, 'configs.json'), 'w') as f:
+        json.dump(configs, f)
+
+
+# Measurements, run inside a child process
+
+def run_scale(workdir, fixtures_dir, scale, repeat):
+    sys.path.insert(0, REPO)
+    os.chdir(workdir)
+    os.environ.pop('CRYPLOT_STORE', None)
+    os.environ.pop('CRYPLOT_REPLAY_DIR', None)
+
+    result = {'scale': scale}
+    start = time.perf_counter()
+    import app
+    result['import_s'] = time.perf_counter() - start
+    app.warm_up()
+    result['cold_start_s'] = time.perf_counter() - start
+    result['rss_after_start_mb'] = peak_rss_mb()
+
+    symbol = app.default_ticker
+    spec, dataset = app.registry[symbol], app.datasets[symbol]
+    result['rows'] = len(dataset)
+
+    from df_maker import load_tickers, df_maker
+    from price_store import PriceStore
+    from predictor import predictor, predict_dayth, ticker_table, dates_to_dayth
+    from plotter import plotter
+    # what Dash sends, make_fig() returns a dict with binary arrays
+    from dash._utils import to_json
+    result['refresh_all_tickers'] = timed(lambda: load_tickers(app.registry.values(), app.store_root), max(1, repeat // 10))
+    store = PriceStore(app.store_root, symbol, spec.epoch, spec.offset)
+    result['df_maker'] = timed(lambda: df_maker(spec.const, spec.coef, spec.epoch.item(), symbol, store=store), max(1, repeat // 10))
+
+    result['predictor'] = timed(lambda: predictor(spec.const, spec.coef, '2030-01-01'), repeat)
+    batch = np.arange('2011-01-01', '2060-01-01', dtype='datetime64[D]')
+    result['predict_batch_18k'] = timed(lambda: predict_dayth(spec.const, spec.coef, dates_to_dayth(batch, spec.epoch, spec.offset)), repeat)
+    table = ticker_table(spec)
+    result['table_lookup'] = timed(lambda: table.index('2030-01-01'), repeat)
+
+    charts = {
+        'linear': (app.make_fig, 'Date', ['Open', 'Prediction', 'plus_bias', 'minus_bias']),
+        'log2': (app.make_log_fig, 'Date', ['log2open', 'PredictedLog2Open', 'log_plus_bias', 'log_minus_bias']),
+        'loglog': (app.make_loglog_fig, 'dayth', ['log2open', 'PredictedLog2Open', 'log_plus_bias', 'log_minus_bias']),
+    }
+    result['figures'] = {}
+    for kind, (make, x, y) in charts.items():
+        full = plotter(dataset, x, y, kind)
+        budget = make(symbol)
+        serialize_full = timed(lambda: to_json(full), max(1, repeat // 10))
+        serialize_budget = timed(lambda: to_json(budget), max(1, repeat // 10))
+        result['figures'][kind] = {
+            'build': timed(lambda: make(symbol), max(1, repeat // 10)),
+            'full_bytes': len(to_json(full)),
+            'full_serialize': serialize_full,
+            'budget_bytes': len(to_json(budget)),
+            'budget_serialize': serialize_budget,
+        }
+
+    zoom = dataset['dayth'][len(dataset) // 2], dataset['dayth'][len(dataset) // 2 + 180]
+    zoom_dates = tuple(np.asarray(dataset['Date'][[len(dataset) // 2, len(dataset) // 2 + 180]], dtype='datetime64[D]').astype(np.float64))
+    result['callbacks'] = {
+        'update_date_result': timed(lambda: app.update_date_result(1, '2030-01-01', symbol), repeat),
+        'update_live_banner': timed(lambda: app.update_live_banner(1, symbol), repeat),
+        'zoom_linear': timed(lambda: app.make_fig(symbol, zoom_dates), max(1, repeat // 10)),
+        'zoom_loglog': timed(lambda: app.make_loglog_fig(symbol, zoom), max(1, repeat // 10)),
+    }
+
+    client = app.server.test_client()
+    layout = client.get('/_dash-layout', headers={'Accept-Encoding': 'gzip'})
+    result['layout'] = {
+        'gzip_bytes': len(layout.data),
+        'serve': timed(lambda: client.get('/_dash-layout', headers={'Accept-Encoding': 'gzip'}), repeat),
+        'revalidate': timed(lambda: client.get('/_dash-layout', headers={'If-None-Match': layout.headers['ETag']}), repeat),
+    }
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_child(workdir, fixtures_dir, scale, repeat, warm=False):
+    args = [sys.executable, os.path.abspath(__file__), '--child', '--workdir', workdir,
+            '--scales', str(scale), '--repeat', str(repeat)]
+    if fixtures_dir:
+        args += ['--fixtures', fixtures_dir]
+    out = subprocess.run(args, check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['store'] = 'warm' if warm else 'cold'
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='1,2,5,10', help='history multiples to run, comma separated')
+    parser.add_argument('--repeat', type=int, default=200, help='samples per latency measurement')
+    parser.add_argument('--fixtures', help='directory of recorded <TICKER>.csv histories')
+    parser.add_argument('--record', help='fetch real histories from Yahoo into this directory and exit')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sys.path.insert(0, REPO)
+
+    if args.record:
+        record(args.record)
+        return
+    if args.child:
+        result = run_scale(args.workdir, args.fixtures, int(args.scales), args.repeat)
+        print(json.dumps(result))
+        return
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'fixtures': args.fixtures or 'synthetic',
+        },
+        'results': [],
+    }
+    for scale in [int(s) for s in args.scales.split(',')]:
+        workdir = tempfile.mkdtemp(prefix=f'cryplot-bench-{scale}x-')
+        try:
+            prepare_workdir(workdir, args.fixtures, scale)
+            # first run seeds the store, the second starts from it
+            report['results'].append(run_child(workdir, args.fixtures, scale, args.repeat))
+            report['results'].append(run_child(workdir, args.fixtures, scale, args.repeat, warm=True))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"{scale}x done", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Publish store updates from one refresher process to every web worker.
+
+The refresher appends new bars to the price stores (``meta.json`` is each
+store's commit point) as soon as it starts and then every ``interval``
+seconds, and atomically replaces ``<store>/VERSION`` after each pass that
+added rows.
+Workers stat that file at most once per ``min_interval`` and rebuild their
+datasets from the local store, without touching the network, when it moved.
+
+    python data_sync.py [--once]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+VERSION_FILE = 'VERSION'
+
+
+def version_path(root):
+    return os.path.join(root, VERSION_FILE)
+
+
+def version_stamp(root):
+    # os.replace gives every publish a new inode, cheaper than reading the file
+    try:
+        st = os.stat(version_path(root))
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def publish_version(root, rows_added=0):
+    path = version_path(root)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'published_at': time.time(), 'rows_added': rows_added}, f)
+    os.replace(tmp, path)
+
+
+def wait_for_store(root, symbol, poll=1.0):
+    """Block until ``symbol``'s store has committed at least one bar."""
+    while True:
+        try:
+            with open(os.path.join(root, symbol, 'meta.json'), 'r') as f:
+                if json.load(f).get('rows'):
+                    return
+        except (FileNotFoundError, ValueError):
+            pass
+        time.sleep(poll)
+
+
+class VersionWatcher:
+    """Calls ``reload`` once per newly published version."""
+
+    def __init__(self, root, reload, min_interval=1.0):
+        self.root = root
+        self.min_interval = min_interval
+        self._reload = reload
+        self._seen = version_stamp(root)
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def check(self):
+        now = time.monotonic()
+        if now - self._checked < self.min_interval:
+            return False
+        self._checked = now
+        stamp = version_stamp(self.root)
+        if stamp is None or stamp == self._seen:
+            return False
+        with self._lock:
+            if stamp == self._seen:
+                return False
+            self._reload()
+            self._seen = stamp
+        return True
+
+
+def run_refresher(specs, root, interval=3600, max_workers=4, once=False, source_config=None):
+    # imported here so web workers can watch versions without loading pandas
+    from df_maker import refresh_stores
+    from sources import set_default_source, source_from_config
+    set_default_source(source_from_config(source_config))
+    while True:
+        added = refresh_stores(specs, root, max_workers)
+        if added:
+            publish_version(root, added)
+            print(f"Published {added} new rows to {root}")
+        if once:
+            return added
+        time.sleep(interval)
+
+
+def start_refresher(specs, root, interval=3600, max_workers=4, source_config=None):
+    """Run the refresher in a freshly spawned process.
+
+    Spawned rather than forked or threaded, so a server that forks workers
+    never does so while a fetch holds a lock.
+    """
+    process = multiprocessing.get_context('spawn').Process(
+        target=run_refresher, args=(list(specs), root, interval, max_workers, False, source_config),
+        name='cryplot-refresher', daemon=True)
+    process.start()
+    return process
+
+
+if __name__ == '__main__':
+    from tickers import load_registry
+    parser = argparse.ArgumentParser(description='Fetch new bars into the price stores and publish a new version.')
+    parser.add_argument('--once', action='store_true', help='refresh once and exit instead of looping')
+    args = parser.parse_args()
+    with open('configs.json', 'r') as f:
+        configs = json.load(f)
+    root = os.environ.get('CRYPLOT_STORE', configs['store_path'])
+    run_refresher(list(load_registry(configs).values()), root, configs.get('refresh_interval', 3600),
+                  configs.get('fetch_workers', 4), once=args.once, source_config=configs.get('data_source'))
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from predictor import dayth_to_dates, predict_dayth, EPOCH, DAYTH_OFFSET, PLUS_BIAS, MINUS_BIAS
+
+# Columns computed from the model in one go, keyed by the predict_dayth name
+MODEL_COLUMNS = {
+    'PredictedLog2Open': 'log2_price',
+    'Prediction': 'price',
+    'plus_bias': 'plus_bias',
+    'minus_bias': 'minus_bias',
+    'log_plus_bias': 'log_plus_bias',
+    'log_minus_bias': 'log_minus_bias',
+}
+COLUMN_ORDER = ['Date', 'Open', 'dayth', 'log2open', 'log2dayth'] + list(MODEL_COLUMNS)
+
+
+class PriceDataset:
+    """Daily prices for one ticker: an int32 day index and float32 opens.
+
+    Every other column is derived on first access and cached, so the three
+    charts share one copy. Indexing by column name mirrors the DataFrame that
+    ``df_maker`` returns, which is what ``plotter`` expects.
+    """
+
+    def __init__(self, dayth, opens, const, coef, epoch=EPOCH, offset=DAYTH_OFFSET,
+                 plus_bias=PLUS_BIAS, minus_bias=MINUS_BIAS):
+        self.dayth = np.asarray(dayth, dtype=np.int32)
+        self.opens = np.asarray(opens, dtype=np.float32)
+        # bars with a price; forecast days pad the rest, so len() does not move when one is appended
+        self.observed = int(np.isfinite(self.opens).sum())
+        self.const = const
+        self.coef = coef
+        self.epoch = epoch
+        self.offset = offset
+        self.bands = {'plus_bias': plus_bias, 'minus_bias': minus_bias}
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.dayth)
+
+    def __getitem__(self, name):
+        if name == 'dayth':
+            return self.dayth
+        if name == 'Open':
+            return self.opens
+        if name not in self._cache:
+            self._derive(name)
+        return self._cache[name]
+
+    def _derive(self, name):
+        if name == 'Date':
+            self._cache[name] = dayth_to_dates(self.dayth, self.epoch, self.offset)
+        elif name == 'log2open':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._cache[name] = np.log2(self.opens)
+        elif name == 'log2dayth':
+            self._cache[name] = np.log2(self.dayth, dtype=np.float32)
+        elif name in MODEL_COLUMNS:
+            pred = predict_dayth(self.const, self.coef, self.dayth, **self.bands)
+            for column, key in MODEL_COLUMNS.items():
+                self._cache[column] = pred[key].astype(np.float32)
+        else:
+            raise KeyError(name)
+
+    @property
+    def nbytes(self):
+        return self.dayth.nbytes + self.opens.nbytes + sum(values.nbytes for values in self._cache.values())
+
+    def to_frame(self):
+        df = pd.DataFrame({name: self[name] for name in COLUMN_ORDER})
+        df['Date'] = df['Date'].astype(str)
+        return df
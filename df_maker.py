@@ -1,52 +1,126 @@
-import pandas as pd
-import yfinance as yf
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from datetime import date, datetime, timedelta
-
-def df_maker(const, coef, start, ticker='BTC-USD'):
-    # Fetch historical data from Yahoo Finance
-    data = yf.Ticker(ticker).history(start=start)
-    df = pd.DataFrame(data)
-    df.reset_index(inplace=True)  # Reset index to make Date a column
-    df['Date'] = df['Date'].dt.date  # Convert Date to date type (removing time)
-    df['Date'] = df['Date'].astype(str)
-    df = df[['Date', 'Open']]
-    
+from datetime import datetime, timedelta
+from predictor import dates_to_dayth, PLUS_BIAS, MINUS_BIAS
+from price_store import PriceStore
+from dataset import PriceDataset
+from sources import default_source
+from tickers import calibrate
+
+def fetch_start(store, start):
+    # Only ask for bars newer than what is already on disk, None when up to date
+    last_date = store.last_date
+    if last_date is not None:
+        start = last_date + timedelta(days=1)
+    if start > datetime.now().date():
+        return None
+    return start
+
+def append_history(store, data):
+    if data.empty:
+        return 0
+    return store.append(data.index.values.astype('datetime64[D]'), data['Open'].values)
+
+def refresh_store(store, start, source=None):
+    start = fetch_start(store, start)
+    if start is None:
+        return 0
+    return append_history(store, (source or default_source()).history(store.ticker, start))
+
+def store_dataset(store, const, coef, plus_bias=PLUS_BIAS, minus_bias=MINUS_BIAS):
+    epoch, offset = store.epoch, store.offset
+    dayth = store.column('dayth')
+    opens = store.column('Open')
+
     # Generate future dates up to 1 year from today
     today = datetime.now().date()
     future_end_date = today + timedelta(days=365)
-    
-    # Get the last date from Yahoo Finance data
-    last_yahoo_date = pd.to_datetime(df['Date'].iloc[-1]).date()
-    
-    # Create future dates from the day after last Yahoo date to 1 year from today
-    if last_yahoo_date < future_end_date:
-        future_dates = pd.date_range(
-            start=last_yahoo_date + timedelta(days=1),
-            end=future_end_date,
-            freq='D'
-        ).date
-        
-        # Create future dataframe with predictions only (no Open prices)
-        future_df = pd.DataFrame({
-            'Date': [str(d) for d in future_dates],
-            'Open': [np.nan] * len(future_dates)  # non open price for future days
-        })
-        
-        # Combine historical and future data
-        df = pd.concat([df, future_df], ignore_index=True)
-    
-    # Calculate predictions for all dates (historical and future)
-    df['dayth'] = (pd.to_datetime(df['Date']) - pd.to_datetime(date(2010, 7, 19))).dt.days + 561
-    df['log2open'] = np.log2(df['Open'])  # Will be NaN for future dates
-    df['log2dayth'] = np.log2(df['dayth'])
-    df['PredictedLog2Open'] = df['log2dayth']*coef + const
-    df['Prediction'] = 2 ** df['PredictedLog2Open']
-    
-    # Add bias columns
-    df['plus_bias'] = df['Prediction'] * 1.8
-    df['minus_bias'] = df['Prediction'] * 0.45
-    df['log_plus_bias'] = np.log2(df['plus_bias'])
-    df['log_minus_bias'] = np.log2(df['minus_bias'])
-    
-    return df
\ No newline at end of file
+    last_dayth = dayth[-1] if len(dayth) else offset - 1
+    future_dayth = np.arange(last_dayth + 1, dates_to_dayth([future_end_date], epoch, offset)[0] + 1)
+    # non open price for future days
+    dayth = np.concatenate([dayth, future_dayth.astype(np.int32)])
+    opens = np.concatenate([opens.astype(np.float32), np.full(len(future_dayth), np.nan, dtype=np.float32)])
+
+    # Predictions for all dates (historical and future) are derived on demand
+    return PriceDataset(dayth, opens, const, coef, epoch, offset, plus_bias, minus_bias)
+
+def df_maker(const, coef, start, ticker='BTC-USD', store=None):
+    if store is None:
+        store = PriceStore(os.environ.get('CRYPLOT_STORE', 'data'), ticker)
+    refresh_store(store, start)
+    return store_dataset(store, const, coef).to_frame()
+
+def open_store(spec, root):
+    store = PriceStore(root, spec.symbol, spec.epoch, spec.offset)
+    # Legacy history is only downloaded once, to seed an empty store
+    if store.rows == 0 and spec.data_path:
+        store.seed_from_csv(spec.data_path)
+    return store
+
+def fit_spec(spec, store, calibration=None):
+    """The spec with const/coef and band multipliers the registry left open filled from the store."""
+    if spec.const is None or spec.coef is None:
+        # running regression sums are kept in the store, this is O(1)
+        const, coef = store.fit_params()
+        spec = spec._replace(const=const, coef=coef)
+    # residual quantiles come from a sketch kept in the store, no history scan
+    return calibrate(spec, store, calibration)
+
+def load_ticker(spec, root, refresh=True, source=None, calibration=None):
+    """Refresh one registry ticker's store and build its dataset.
+
+    Returns (spec, dataset); the spec has const/coef and the band multipliers
+    filled in when the registry leaves them to be fitted and calibrated. With
+    ``refresh=False`` only the local store is read, an empty one is not seeded.
+    """
+    if refresh:
+        store = open_store(spec, root)
+        refresh_store(store, spec.epoch.item(), source)
+    else:
+        store = PriceStore(root, spec.symbol, spec.epoch, spec.offset)
+    if store.rows == 0:
+        raise ValueError(f'no price history for {spec.symbol}')
+    spec = fit_spec(spec, store, calibration)
+    dataset = store_dataset(store, spec.const, spec.coef, spec.plus_bias, spec.minus_bias)
+    return spec, dataset
+
+def load_tickers(specs, root, max_workers=4, refresh=True, source=None, calibration=None):
+    specs = list(specs)
+    if refresh:
+        # one batched fetch for every ticker, datasets are then built from the stores
+        refresh_stores(specs, root, max_workers, source)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {spec.symbol: pool.submit(load_ticker, spec, root, False, calibration=calibration) for spec in specs}
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                print(f"Could not load {symbol}: {e}")
+    return results
+
+def refresh_stores(specs, root, max_workers=4, source=None):
+    """Fetch new bars into every ticker's store in one batched request.
+
+    Returns the number of rows added.
+    """
+    stores = {}
+    # seeding from legacy CSVs is I/O bound, run it in a small pool
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {spec.symbol: (spec, pool.submit(open_store, spec, root)) for spec in specs}
+        for symbol, (spec, future) in futures.items():
+            try:
+                stores[symbol] = future.result(), spec.epoch.item()
+            except Exception as e:
+                print(f"Could not open {symbol}: {e}")
+    starts = {symbol: fetch_start(store, start) for symbol, (store, start) in stores.items()}
+    starts = {symbol: start for symbol, start in starts.items() if start is not None}
+    if not starts:
+        return 0
+    try:
+        histories = (source or default_source()).history_many(starts)
+    except Exception as e:
+        print(f"Could not refresh {', '.join(starts)}: {e}")
+        return 0
+    return sum(append_history(stores[symbol][0], data) for symbol, data in histories.items())
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of ``n_out`` points that keep
+    the visual shape of the (x, y) line. ``x`` must be numeric and sorted."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # bucket boundaries for the n - 2 interior points
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def smooth_indices(n, n_out, log=False):
+    """Evenly spaced indices for smooth analytic curves; geometric spacing
+    when the x axis is logarithmic so the low end keeps its resolution."""
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    if log:
+        idx = np.geomspace(1, n, n_out) - 1
+    else:
+        idx = np.linspace(0, n - 1, n_out)
+    return np.unique(np.round(idx).astype(np.int64))
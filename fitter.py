@@ -0,0 +1,87 @@
+import json
+import sys
+import numpy as np
+
+
+class RunningFit:
+    """Closed-form least squares of y = coef * x + const from running sums.
+
+    With x = log2(dayth) and y = log2(Open) this is the power-law model;
+    appending bars only adds their sums, so refits cost O(new bars).
+    """
+
+    FIELDS = ('n', 'sx', 'sy', 'sxy', 'sxx')
+
+    def __init__(self, n=0, sx=0.0, sy=0.0, sxy=0.0, sxx=0.0):
+        self.n = n
+        self.sx = sx
+        self.sy = sy
+        self.sxy = sxy
+        self.sxx = sxx
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        ok = np.isfinite(x) & np.isfinite(y)
+        x, y = x[ok], y[ok]
+        self.n += int(len(x))
+        self.sx += float(x.sum())
+        self.sy += float(y.sum())
+        self.sxy += float(x @ y)
+        self.sxx += float(x @ x)
+        return self
+
+    def params(self):
+        """(const, coef), or None until there are two distinct x values."""
+        denom = self.n * self.sxx - self.sx ** 2
+        if self.n < 2 or denom <= 0:
+            return None
+        coef = (self.n * self.sxy - self.sx * self.sy) / denom
+        const = (self.sy - coef * self.sx) / self.n
+        return const, coef
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.FIELDS})
+
+
+def full_fit(x, y):
+    # Independent lstsq refit over the whole history, to check the running sums
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(x) & np.isfinite(y)
+    if ok.sum() < 2:
+        return None
+    design = np.column_stack([x[ok], np.ones(ok.sum())])
+    (coef, const), *_ = np.linalg.lstsq(design, y[ok], rcond=None)
+    return float(const), float(coef)
+
+
+def verify_store(store, tol=1e-8):
+    running = store.fit().params()
+    full = full_fit(store.column('log2dayth'), store.column('log2open'))
+    if running is None or full is None:
+        return running is None and full is None, running, full
+    ok = np.allclose(running, full, rtol=tol, atol=tol)
+    return ok, running, full
+
+
+if __name__ == '__main__':
+    # python fitter.py [TICKER ...]: compare running and full fits per store
+    from price_store import PriceStore
+    from tickers import load_registry
+    import os
+    with open('configs.json', 'r') as f:
+        configs = json.load(f)
+    registry = load_registry(configs)
+    root = os.environ.get('CRYPLOT_STORE', configs['store_path'])
+    failed = False
+    for symbol in sys.argv[1:] or list(registry):
+        spec = registry[symbol]
+        ok, running, full = verify_store(PriceStore(root, symbol, spec.epoch, spec.offset))
+        failed |= not ok
+        print(f"{symbol}: running={running} full={full} {'ok' if ok else 'MISMATCH'}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,73 @@
+# Production server: gunicorn -c gunicorn.conf.py app:server
+#
+# The app is imported once in the master (preload_app), which only builds the
+# Dash app. A single spawned refresher process is the only one that fetches:
+# it fills the price stores right away, then appends new bars every
+# refresh_interval and publishes a new store version, see data_sync.py. Each
+# worker answers /healthz at once and builds its datasets, lookup tables,
+# figures and layout from the stores in a warm-up thread, waiting for the
+# refresher's first pass on a cold start; /readyz turns 200 when it is done.
+# With CRYPLOT_PRELOAD_DATA=1 the master warms up instead, so the data is built
+# once and shared copy-on-write at the cost of no worker serving until then.
+# With alerts.enabled another process evaluates band-crossing alerts, see
+# alerts.py.
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8050)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+timeout = 120
+
+refresher = None
+alerter = None
+# every worker leaves its metrics here, so a scrape of any one reports them all
+metrics_dir = os.environ.setdefault('CRYPLOT_METRICS_DIR',
+                                    os.path.join(tempfile.gettempdir(), f'cryplot-metrics-{os.getpid()}'))
+
+
+def when_ready(server):
+    global refresher, alerter
+    import app
+    from data_sync import start_refresher
+    from tickers import load_registry
+    registry = load_registry(app.configs)
+    # the startup fetch runs there too, so the master never blocks on the network
+    refresher = start_refresher(registry.values(), app.store_root,
+                                app.configs.get('refresh_interval', 3600), app.configs.get('fetch_workers', 4),
+                                app.configs.get('data_source'))
+    if os.environ.get('CRYPLOT_PRELOAD_DATA') == '1':
+        app.warm_up(refresh=False)
+    alert_configs = app.configs.get('alerts', {})
+    if alert_configs.get('enabled'):
+        from alerts import start_alerter
+        alerter = start_alerter([registry[symbol] for symbol in alert_configs.get('watchlist') or registry],
+                                app.store_root, alert_configs.get('interval', 60), alert_configs.get('sinks', ['log']),
+                                app.configs.get('calibration'))
+
+
+def pre_fork(server, worker):
+    # keep the garbage collector from touching (and so copying) preloaded objects
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app
+    app.start_background(refresh=False)
+
+
+def child_exit(server, worker):
+    from metrics import remove_snapshot
+    remove_snapshot(metrics_dir, worker.pid)
+
+
+def on_exit(server):
+    for process in (refresher, alerter):
+        if process is not None and process.is_alive():
+            process.terminate()
+    shutil.rmtree(metrics_dir, ignore_errors=True)
@@ -0,0 +1,148 @@
+"""Date-range slices of a ticker's dataset, resampled and streamed as CSV, JSON or Arrow.
+
+Rows are found with two binary searches on the sorted day index, and weekly
+or monthly rows come from one ``reduceat`` pass. Output is written
+``CHUNK_ROWS`` rows at a time, so a response never holds more than one chunk
+of text.
+"""
+import io
+import json
+import numpy as np
+from dataset import COLUMN_ORDER
+from predictor import dates_to_dayth
+
+FREQS = ('D', 'W', 'M')
+FORMATS = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+DEFAULT_COLUMNS = ['Open', 'Prediction', 'plus_bias', 'minus_bias']
+CHUNK_ROWS = 4096
+
+
+def row_range(dayth, start=None, end=None):
+    """[lo, hi) of the rows with start <= dayth <= end."""
+    lo = 0 if start is None else int(np.searchsorted(dayth, start, side='left'))
+    hi = len(dayth) if end is None else int(np.searchsorted(dayth, end, side='right'))
+    return lo, max(lo, hi)
+
+
+def period_starts(dates, freq):
+    """The Monday of each date's week, or the first of its month."""
+    if freq == 'W':
+        # day 0, 1970-01-01, was a Thursday
+        days = dates.astype(np.int64)
+        return (days - (days + 3) % 7).astype('datetime64[D]')
+    return dates.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def ohlc(values, starts, ends):
+    """First, highest, lowest and last finite value per [start, end] group, NaN for none."""
+    n = len(values)
+    index = np.arange(n)
+    finite = np.isfinite(values)
+    first = np.minimum.accumulate(np.where(finite, index, n)[::-1])[::-1][starts]
+    last = np.maximum.accumulate(np.where(finite, index, -1))[ends]
+    found = first <= ends
+    padded = np.append(values, np.nan).astype(values.dtype)
+    return {
+        'open': np.where(found, padded[first], np.nan).astype(values.dtype),
+        'high': np.fmax.reduceat(values, starts),
+        'low': np.fmin.reduceat(values, starts),
+        'close': np.where(found, padded[last], np.nan).astype(values.dtype),
+    }
+
+
+def resample(dates, columns, freq):
+    """One row per week or month, labelled by its first day.
+
+    ``Open`` becomes open/high/low/close of the daily opens, every other
+    column takes its value on the period's last day.
+    """
+    if freq == 'D' or not len(dates):
+        return dates, columns
+    keys = period_starts(dates, freq)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    out = {}
+    for name, values in columns.items():
+        if name == 'Open':
+            out.update(ohlc(values, starts, ends))
+        else:
+            out[name] = values[ends]
+    return keys[starts], out
+
+
+def query(dataset, start=None, end=None, freq='D', columns=None):
+    """(dates, {name: values}) for a date range of ``dataset``, raises ValueError on bad arguments."""
+    if freq not in FREQS:
+        raise ValueError(f'freq must be one of {", ".join(FREQS)}')
+    columns = columns or DEFAULT_COLUMNS
+    unknown = [name for name in columns if name not in COLUMN_ORDER or name == 'Date']
+    if unknown:
+        raise ValueError(f'unknown columns {", ".join(unknown)}')
+    bounds = [None if value is None else dates_to_dayth([value], dataset.epoch, dataset.offset)[0]
+              for value in (start, end)]
+    lo, hi = row_range(dataset.dayth, *bounds)
+    dates = dataset['Date'][lo:hi]
+    return resample(dates, {name: dataset[name][lo:hi] for name in dict.fromkeys(columns)}, freq)
+
+
+def format_column(values, null):
+    if values.dtype.kind == 'M':
+        return values.astype(str)
+    # float32 columns only hold about 7 significant digits
+    text = np.char.mod('%.7g' if values.dtype == np.float32 else '%.15g', values)
+    text[~np.isfinite(values)] = null
+    return text
+
+
+def chunks(n, chunk_rows=CHUNK_ROWS):
+    return [(lo, min(lo + chunk_rows, n)) for lo in range(0, n, chunk_rows)]
+
+
+def csv_stream(dates, columns):
+    yield ','.join(['Date'] + list(columns)) + '\n'
+    for lo, hi in chunks(len(dates)):
+        fields = [format_column(dates[lo:hi], '')] + [format_column(values[lo:hi], '') for values in columns.values()]
+        yield ''.join(','.join(row) + '\n' for row in zip(*fields))
+
+
+def json_stream(meta, dates, columns):
+    # column arrays, as /api/predict returns them
+    yield json.dumps(meta)[:-1]
+    for name, values in [('Date', dates)] + list(columns.items()):
+        yield f', {json.dumps(name)}: ['
+        for lo, hi in chunks(len(values)):
+            text = format_column(values[lo:hi], 'null')
+            body = json.dumps(text.tolist())[1:-1] if name == 'Date' else ','.join(text)
+            yield (',' if lo else '') + body
+        yield ']'
+    yield '}'
+
+
+def arrow_stream(dates, columns):
+    import pyarrow as pa
+    schema = pa.schema([('Date', pa.date32())] +
+                       [(name, pa.from_numpy_dtype(values.dtype)) for name, values in columns.items()])
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for lo, hi in chunks(len(dates)):
+            writer.write_batch(pa.record_batch(
+                [pa.array(dates[lo:hi], type=pa.date32())] +
+                # NaN opens (forecast days) become nulls
+                [pa.array(values[lo:hi], from_pandas=True) for values in columns.values()],
+                schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def stream(fmt, meta, dates, columns):
+    if fmt == 'csv':
+        return csv_stream(dates, columns)
+    if fmt == 'arrow':
+        return arrow_stream(dates, columns)
+    return json_stream(meta, dates, columns)
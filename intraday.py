@@ -0,0 +1,122 @@
+import threading
+import time
+import numpy as np
+from sources import Quote, default_source
+
+
+class RingBuffer:
+    """Fixed-size columnar buffer of the latest bars, ordered by ``ts``.
+
+    Columns are preallocated NumPy arrays written in place, so appending a
+    tick never reallocates. ``since`` costs O(log capacity + new points).
+    """
+
+    def __init__(self, capacity, columns=(('ts', np.int64), ('price', np.float64))):
+        self.capacity = capacity
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns}
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def _segments(self):
+        # oldest first; once full the buffer wraps at the write head
+        if self._size < self.capacity:
+            return [slice(0, self._size)]
+        return [slice(self._head, self.capacity), slice(0, self._head)]
+
+    def append(self, **values):
+        """Append rows newer than the last stored ``ts``, returns how many were kept."""
+        ts = np.asarray(values['ts'], dtype=np.int64)
+        with self._lock:
+            keep = ts > self._last_ts() if self._size else np.ones(len(ts), dtype=bool)
+            rows = np.flatnonzero(keep)[-self.capacity:]
+            if len(rows) == 0:
+                return 0
+            at = (self._head + np.arange(len(rows))) % self.capacity
+            for name, column in self.columns.items():
+                column[at] = np.asarray(values[name])[rows]
+            self._head = (self._head + len(rows)) % self.capacity
+            self._size = min(self._size + len(rows), self.capacity)
+            return len(rows)
+
+    def _last_ts(self):
+        return self.columns['ts'][(self._head - 1) % self.capacity]
+
+    def last(self):
+        with self._lock:
+            if not self._size:
+                return None
+            i = (self._head - 1) % self.capacity
+            return {name: column[i].item() for name, column in self.columns.items()}
+
+    def since(self, ts=None):
+        """Copies of every row with ``ts`` strictly after the given one (all rows for None)."""
+        with self._lock:
+            parts = {name: [] for name in self.columns}
+            for segment in self._segments():
+                start = 0 if ts is None else np.searchsorted(self.columns['ts'][segment], ts, side='right')
+                for name, column in self.columns.items():
+                    parts[name].append(column[segment][start:])
+            return {name: np.concatenate(chunks) for name, chunks in parts.items()}
+
+
+class IntradayFeed:
+    """Minute bars for one ticker, polled into a RingBuffer by a daemon thread.
+
+    The latest bar doubles as the live quote, so the banner and the intraday
+    chart read the same stream.
+    """
+
+    def __init__(self, ticker, capacity=1440, interval=60, source=None):
+        self.ticker = ticker
+        self.interval = interval
+        self.buffer = RingBuffer(capacity)
+        self._source = source
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def quote(self):
+        last = self.buffer.last()
+        if last is None:
+            return None
+        return Quote(price=last['price'], date=time.strftime('%Y-%m-%d', time.gmtime(last['ts'] / 1000)),
+                     fetched_at=self._fetched_at)
+
+    def is_stale(self, ttl):
+        return self._fetched_at is None or time.time() - self._fetched_at > ttl
+
+    def refresh(self):
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            last = self.buffer.last()
+            start = None if last is None else np.datetime64(last['ts'], 'ms').item()
+            data = (self._source or default_source()).intraday(self.ticker, start)
+            self._fetched_at = time.time()
+            return self.buffer.append(ts=data.index.values.astype('datetime64[ms]').astype(np.int64),
+                                      price=data['Close'].to_numpy(dtype=np.float64))
+        except Exception as e:
+            print(f"Could not refresh {self.ticker} intraday bars: {e}")
+            return 0
+        finally:
+            self._lock.release()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'intraday-{self.ticker}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
@@ -0,0 +1,62 @@
+import threading
+import time
+from metrics import cache_requests
+from sources import default_source
+
+
+def fetch_quote(ticker):
+    return default_source().quote(ticker)
+
+
+class LivePriceCache:
+    """Latest quote for one ticker, refreshed by a daemon thread.
+
+    Readers never touch the network: ``get`` returns the last good quote (or
+    None before the first successful fetch). A failed fetch keeps the old one.
+    """
+
+    def __init__(self, ticker='BTC-USD', interval=60, ttl=300, fetch=fetch_quote):
+        self.ticker = ticker
+        self.interval = interval
+        self.ttl = ttl
+        self._fetch = fetch
+        self._quote = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def get(self):
+        result = 'empty' if self._quote is None else 'stale' if self.is_stale() else 'fresh'
+        cache_requests.inc(cache='live_price', result=result)
+        return self._quote
+
+    def is_stale(self):
+        quote = self._quote
+        return quote is None or time.time() - quote.fetched_at > self.ttl
+
+    def refresh(self):
+        # serialize fetches so a slow Yahoo never has two requests in flight
+        if not self._lock.acquire(blocking=False):
+            return self._quote
+        try:
+            self._quote = self._fetch(self.ticker)
+        except Exception as e:
+            print(f"Could not refresh {self.ticker} price: {e}")
+        finally:
+            self._lock.release()
+        return self._quote
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'live-price-{self.ticker}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
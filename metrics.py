@@ -0,0 +1,266 @@
+"""Process-local counters, gauges and histograms in Prometheus text format.
+
+``install(server)`` adds ``/metrics`` and request timing to a Flask server.
+With ``CRYPLOT_PROFILE=1`` a request sent with ``X-Cryplot-Profile: 1`` is
+run under cProfile; stats are written to ``CRYPLOT_PROFILE_DIR`` and the
+file name is returned in the ``X-Cryplot-Profile-File`` header.
+
+With ``CRYPLOT_METRICS_DIR`` set (gunicorn.conf.py does), every serving
+process writes its samples to ``<dir>/<pid>.json`` every few seconds, and
+a scrape of any worker returns all of them with a ``worker`` label.
+"""
+import cProfile
+import functools
+import glob
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+import flask
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6, 1e7)
+# seconds between a worker's snapshots, older samples of other workers show up in a scrape
+SNAPSHOT_INTERVAL = 5
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels) + '}'
+
+
+class Metric:
+    """Samples set through the subclass methods, or read from ``fn()`` -> [(labels dict, value)] at scrape time."""
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, fn=None):
+        self.name = name
+        self.help = help_text
+        self._fn = fn
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def samples(self):
+        if self._fn is not None:
+            return [(self.name, tuple(sorted(labels.items())), value) for labels, value in self._fn()]
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in self._values.items()]
+
+    def render(self, workers=None):
+        """This process's samples, or ``{worker: samples}`` each labelled with its worker."""
+        help_text = self.help.replace('\\', '\\\\').replace('\n', '\\n')
+        lines = [f'# HELP {self.name} {help_text}', f'# TYPE {self.name} {self.kind}']
+        for worker, samples in (workers or {None: self.samples()}).items():
+            for name, labels, value in samples:
+                labels = tuple(labels) if worker is None else (('worker', worker),) + tuple(map(tuple, labels))
+                lines.append(f'{name}{label_text(labels)} {value:g}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for labels, (counts, total) in self._values.items():
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    out.append((self.name + '_bucket', labels + (('le', f'{bound:g}' if bound != '+Inf' else bound),), count))
+                out.append((self.name + '_sum', labels, total))
+                out.append((self.name + '_count', labels, counts[-1]))
+        return out
+
+
+REGISTRY = []
+
+callback_seconds = Histogram('cryplot_callback_seconds', 'Dash callback latency')
+callback_errors = Counter('cryplot_callback_errors_total', 'Dash callbacks that raised')
+request_seconds = Histogram('cryplot_request_seconds', 'HTTP request latency by endpoint')
+response_bytes = Histogram('cryplot_response_bytes', 'HTTP response body size by endpoint', SIZE_BUCKETS)
+fetch_seconds = Histogram('cryplot_fetch_seconds', 'Outbound market data fetch latency')
+fetch_errors = Counter('cryplot_fetch_errors_total', 'Outbound market data fetches that failed')
+cache_requests = Counter('cryplot_cache_requests_total', 'Cache lookups by cache and result')
+payload_bytes = Gauge('cryplot_payload_bytes', 'Size of cached serialized payloads by encoding')
+dataset_rows = Gauge('cryplot_dataset_rows', 'Rows held per ticker dataset, forecast days included')
+
+
+def render():
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+
+class Snapshots:
+    """Samples of every serving process, shared through one file per pid."""
+
+    def __init__(self, path, interval=SNAPSHOT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _file(self, pid):
+        return os.path.join(self.path, f'{pid}.json')
+
+    def start(self):
+        # threads do not survive a fork, each worker starts its writer on its first request
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        os.makedirs(self.path, exist_ok=True)
+        threading.Thread(target=self._run, name='metrics-snapshot', daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Could not write metrics snapshot: {e}")
+            time.sleep(self.interval)
+
+    def write(self):
+        tmp = f'{self._file(os.getpid())}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({metric.name: metric.samples() for metric in REGISTRY}, f)
+        os.replace(tmp, self._file(os.getpid()))
+
+    def render(self):
+        self.write()
+        workers = {}
+        for path in glob.glob(os.path.join(self.path, '*.json')):
+            try:
+                with open(path, 'r') as f:
+                    workers[os.path.basename(path)[:-len('.json')]] = json.load(f)
+            except (OSError, ValueError):
+                # the worker exited or is between writes, it is back next scrape
+                continue
+        return '\n'.join(metric.render({worker: samples.get(metric.name, []) for worker, samples in sorted(workers.items())})
+                         for metric in REGISTRY) + '\n'
+
+
+def remove_snapshot(path, pid):
+    """Drop an exited worker's samples, see gunicorn.conf.py."""
+    try:
+        os.remove(os.path.join(path, f'{pid}.json'))
+    except FileNotFoundError:
+        pass
+
+
+def time_callback(fn):
+    """Record latency and failures of a Dash callback under its function name."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            callback_errors.inc(callback=fn.__name__)
+            raise
+        finally:
+            callback_seconds.observe(time.perf_counter() - start, callback=fn.__name__)
+    return wrapper
+
+
+@contextmanager
+def time_fetch(ticker, kind):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        fetch_errors.inc(ticker=ticker, kind=kind)
+        raise
+    finally:
+        fetch_seconds.observe(time.perf_counter() - start, ticker=ticker, kind=kind)
+
+
+def counted(chunks, endpoint):
+    # a streamed body is sized once its last chunk is sent, an aborted one is not recorded
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        yield chunk
+    response_bytes.observe(size, endpoint=endpoint)
+
+
+def install(server):
+    profiling = os.environ.get('CRYPLOT_PROFILE') == '1'
+    profile_dir = os.environ.get('CRYPLOT_PROFILE_DIR', 'profiles')
+    snapshots = Snapshots(os.environ['CRYPLOT_METRICS_DIR']) if os.environ.get('CRYPLOT_METRICS_DIR') else None
+
+    @server.before_request
+    def start_request():
+        if snapshots is not None:
+            snapshots.start()
+        flask.g.cryplot_start = time.perf_counter()
+        if profiling and flask.request.headers.get('X-Cryplot-Profile') == '1':
+            flask.g.cryplot_profile = cProfile.Profile()
+            flask.g.cryplot_profile.enable()
+
+    @server.after_request
+    def finish_request(response):
+        endpoint = flask.request.endpoint or 'unmatched'
+        start = getattr(flask.g, 'cryplot_start', None)
+        if start is not None:
+            request_seconds.observe(time.perf_counter() - start, endpoint=endpoint)
+        if response.is_streamed and not response.direct_passthrough:
+            response.response = counted(response.iter_encoded(), endpoint)
+        elif not response.direct_passthrough:
+            response_bytes.observe(response.content_length or 0, endpoint=endpoint)
+        profile = getattr(flask.g, 'cryplot_profile', None)
+        if profile is not None:
+            profile.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{endpoint}.prof')
+            pstats.Stats(profile).dump_stats(path)
+            response.headers['X-Cryplot-Profile-File'] = path
+        return response
+
+    @server.route('/metrics')
+    def metrics():
+        return flask.Response(render() if snapshots is None else snapshots.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import threading
+from collections import namedtuple
+import flask
+from dash._utils import to_json
+from metrics import cache_requests, payload_bytes
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+Payload = namedtuple('Payload', ['version', 'etags', 'encodings'])
+
+
+def accepted_encodings(header):
+    return {part.split(';')[0].strip().lower() for part in (header or '').split(',')}
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    return header.strip() == '*' or etag in [tag.strip() for tag in header.split(',')]
+
+
+class PayloadCache:
+    """Serialized JSON kept identity, gzip and (if installed) brotli encoded.
+
+    ``build`` is only called again once ``version()`` changes.
+    """
+
+    def __init__(self, name, build, version):
+        self.name = name
+        self._build = build
+        self._version = version
+        self._payload = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = self._version()
+        payload = self._payload
+        if payload is not None and payload.version == version:
+            cache_requests.inc(cache=self.name, result='hit')
+            return payload
+        with self._lock:
+            if self._payload is None or self._payload.version != version:
+                cache_requests.inc(cache=self.name, result='miss')
+                self._payload = self._encode(version, self._build())
+                for encoding, body in self._payload.encodings.items():
+                    payload_bytes.set(len(body), cache=self.name, encoding=encoding)
+            return self._payload
+
+    @staticmethod
+    def _encode(version, body):
+        encodings = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            encodings['br'] = brotli.compress(body, quality=11)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # strong validators differ per content-coding, see RFC 9110 8.8.3
+        etags = {name: f'"{digest}"' if name == 'identity' else f'"{digest}-{name}"' for name in encodings}
+        return Payload(version, etags, encodings)
+
+    def response(self, request):
+        payload = self.get()
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding'))
+        encoding = next((name for name in ('br', 'gzip') if name in accepted and name in payload.encodings), 'identity')
+        headers = {
+            'ETag': payload.etags[encoding],
+            'Vary': 'Accept-Encoding',
+            # always revalidate, an unchanged payload costs a 304
+            'Cache-Control': 'no-cache',
+        }
+        if etag_matches(request.headers.get('If-None-Match'), payload.etags[encoding]):
+            return flask.Response(status=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return flask.Response(payload.encodings[encoding], mimetype='application/json', headers=headers)
+
+
+def cache_layout(app, version):
+    """Serve ``/_dash-layout`` from a PayloadCache rebuilt per data version."""
+    cache = PayloadCache('layout', lambda: to_json(app._layout_value()).encode('utf-8'), version)
+    layout_path = app.config.routes_pathname_prefix + '_dash-layout'
+
+    @app.server.before_request
+    def serve_cached_layout():
+        if flask.request.path == layout_path and flask.request.method == 'GET':
+            return cache.response(flask.request)
+
+    return cache
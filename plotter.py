@@ -1,8 +1,47 @@
+import base64
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+from downsample import lttb, smooth_indices
+from dataset import PriceDataset
 
-def plotter(df: pd.DataFrame, x: str, y: list[str], title: str):
+def numeric_x(values):
+    # Date strings become day numbers so they can be bucketed and compared
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64)
+    return np.asarray(values, dtype='datetime64[D]').astype(np.float64)
+
+def typed_array(values, dtype):
+    # plotly.js decodes {'dtype', 'bdata'} straight into a typed array
+    values = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {'dtype': dtype, 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+
+def typed_figure(fig):
+    """The figure as a dict, with WebGL trace arrays sent as binary.
+
+    y goes as float32, integer x (day numbers) as int32 and any other x
+    (epoch milliseconds on date axes) as float64. SVG traces are left alone.
+    """
+    figure = fig.to_plotly_json()
+    for trace in figure['data']:
+        if trace.get('type') != 'scattergl':
+            continue
+        x = np.asarray(trace['x'])
+        trace['x'] = typed_array(x, 'i4' if x.dtype.kind in 'iu' else 'f8')
+        trace['y'] = typed_array(trace['y'], 'f4')
+    return figure
+
+def plotter(df: 'pd.DataFrame | PriceDataset', x: str, y: list[str], title: str,
+            max_points: int = None, x_range: tuple = None, log_x: bool = False, webgl_threshold: int = None):
     fig = go.Figure()
+    xs = numeric_x(df[x])
+    rows = np.arange(len(xs))
+    if x_range is not None:
+        # only the visible window (plus some margin for panning) is sent
+        lo, hi = x_range
+        pad = (hi - lo) * 0.5
+        rows = rows[(xs >= lo - pad) & (xs <= hi + pad)]
 
     # Define colors and styles for different traces
     colors = ['#F7931A', '#667eea', '#FF6B6B', '#4ECDC4']  # Bitcoin orange, blue, red, teal
@@ -13,10 +52,31 @@ def plotter(df: pd.DataFrame, x: str, y: list[str], title: str):
         dict(width=1, dash='dash')        # Minus bias
     ]
     
+    traces = []
     for i, y_col in enumerate(y):
-        fig.add_trace(go.Scatter(
-            x=df[x],
-            y=df[y_col],
+        values = np.asarray(df[y_col])
+        keep = rows[np.isfinite(values[rows])]
+        if max_points is not None and len(keep) > max_points:
+            if i == 0:
+                # the price series is noisy, keep its peaks and troughs
+                keep = keep[lttb(xs[keep], values[keep], max_points)]
+            else:
+                keep = keep[smooth_indices(len(keep), max_points, log=log_x)]
+        traces.append((y_col, values, keep))
+
+    # past the threshold WebGL draws faster and typed_figure() can send binary arrays
+    webgl = webgl_threshold is not None and sum(len(keep) for _, _, keep in traces) > webgl_threshold
+    scatter = go.Scattergl if webgl else go.Scatter
+    x_all = np.asarray(df[x])
+    for i, (y_col, values, keep) in enumerate(traces):
+        x_values = x_all[keep]
+        if x_values.dtype.kind == 'M':
+            # epoch milliseconds on a date axis for WebGL, else plain YYYY-MM-DD,
+            # datetime64 would serialize with a time part
+            x_values = x_values.astype('datetime64[ms]').astype(np.float64) if webgl else x_values.astype(str)
+        fig.add_trace(scatter(
+            x=x_values,
+            y=values[keep],
             mode='lines',
             name=y_col,
             hoverinfo='none', 
@@ -34,8 +94,10 @@ def plotter(df: pd.DataFrame, x: str, y: list[str], title: str):
         ),
         showlegend=False,
         hovermode='x unified',
+        uirevision=title,  # keep the user's zoom when the figure is replaced
         template='plotly_white',
         xaxis=dict(
+            type='date' if webgl and x_all.dtype.kind == 'M' else '-',
             tickformat='%Y-%m-%d',
             gridcolor='rgba(0,0,0,0.1)',
             showgrid=True,
@@ -68,3 +130,86 @@ def plotter(df: pd.DataFrame, x: str, y: list[str], title: str):
     )
 
     return fig
+
+def intraday_plotter(ts_ms, prices, title: str):
+    # x stays epoch milliseconds so extendData can append raw numbers
+    fig = go.Figure(go.Scatter(
+        x=np.asarray(ts_ms).tolist(),
+        y=np.asarray(prices).tolist(),
+        mode='lines',
+        name='Price',
+        line=dict(width=2, color='#F7931A'),
+        hovertemplate='%{x|%Y-%m-%d %H:%M} UTC<br>$%{y:,.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=dict(
+            text=title,
+            font=dict(size=16, family="Segoe UI, Arial, sans-serif", color='#495057'),
+            x=0.5,
+            xanchor='center'
+        ),
+        showlegend=False,
+        uirevision=title,
+        template='plotly_white',
+        xaxis=dict(
+            type='date',
+            tickformat='%H:%M',
+            gridcolor='rgba(0,0,0,0.1)',
+            title=dict(text="Time (UTC)", font=dict(color='#495057'))
+        ),
+        yaxis=dict(
+            gridcolor='rgba(0,0,0,0.1)',
+            title=dict(text="Price (USD)", font=dict(color='#495057'))
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=50, r=50, t=50, b=50),
+        font=dict(family="Segoe UI, Arial, sans-serif", color='#495057')
+    )
+    return fig
+
+
+def fan_plotter(dates, model, percentiles, title: str):
+    # bands between matching outer percentiles, the median and the model line on top
+    x = np.asarray(dates).astype(str).tolist()
+    qs = sorted(percentiles)
+    fig = go.Figure()
+    for lo, hi in list(zip(qs, qs[::-1]))[:len(qs) // 2]:
+        fig.add_trace(go.Scatter(x=x, y=np.asarray(percentiles[hi]).tolist(), mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=x, y=np.asarray(percentiles[lo]).tolist(), mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor='rgba(247, 147, 26, 0.2)', name=f'{lo}–{hi}%',
+                                 hoverinfo='skip'))
+    if len(qs) % 2:
+        median = qs[len(qs) // 2]
+        fig.add_trace(go.Scatter(x=x, y=np.asarray(percentiles[median]).tolist(), mode='lines', name='Median',
+                                 line=dict(width=2, color='#F7931A'),
+                                 hovertemplate='Median $%{y:,.0f}<extra></extra>'))
+    fig.add_trace(go.Scatter(x=x, y=np.asarray(model).tolist(), mode='lines', name='Model',
+                             line=dict(width=2, color='#495057', dash='dot'),
+                             hovertemplate='Model $%{y:,.0f}<extra></extra>'))
+    fig.update_layout(
+        title=dict(
+            text=title,
+            font=dict(size=16, family="Segoe UI, Arial, sans-serif", color='#495057'),
+            x=0.5,
+            xanchor='center'
+        ),
+        hovermode='x unified',
+        template='plotly_white',
+        xaxis=dict(
+            type='date',
+            gridcolor='rgba(0,0,0,0.1)',
+            title=dict(text="Date", font=dict(color='#495057'))
+        ),
+        yaxis=dict(
+            type='log',
+            gridcolor='rgba(0,0,0,0.1)',
+            title=dict(text="Price (USD)", font=dict(color='#495057'))
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=50, r=50, t=50, b=50),
+        font=dict(family="Segoe UI, Arial, sans-serif", color='#495057')
+    )
+    return fig
@@ -1,11 +1,121 @@
 import numpy as np
-from datetime import datetime, date
+from datetime import date
+from functools import lru_cache
 
-def predictor(const, coef, date_text):
-    date_object = datetime.strptime(date_text, '%Y-%m-%d').date()
-    dayth = (date_object - date(2010, 7, 19)).days
-    dayth = dayth + 561
+EPOCH = np.datetime64('2010-07-19', 'D')
+DAYTH_OFFSET = 561
+# Dates the app accepts for a prediction
+MIN_DATE = np.datetime64('2010-07-19', 'D')
+MAX_DATE = np.datetime64('2060-07-19', 'D')
+PLUS_BIAS = 1.8
+MINUS_BIAS = 0.45
+
+
+def iso_shaped(texts):
+    """True when every string is exactly YYYY-MM-DD.
+
+    Checked up front because NumPy also parses '2025' or '2025-01', and
+    date.fromisoformat takes '20250101' on Python 3.11+ but not on 3.9.
+    """
+    texts = np.asarray(texts)
+    if texts.dtype.kind != 'U' or texts.dtype.itemsize != 40:
+        return texts.size == 0
+    codes = texts.view(np.uint32).reshape(-1, 10)
+    digits = (codes >= ord('0')) & (codes <= ord('9'))
+    return bool(digits[:, [0, 1, 2, 3, 5, 6, 8, 9]].all() and (codes[:, [4, 7]] == ord('-')).all())
+
+
+def dates_to_dayth(dates, epoch=EPOCH, offset=DAYTH_OFFSET):
+    # ISO 'YYYY-MM-DD' strings, dates or datetime64 values, parsed in one pass
+    dates = np.asarray(dates)
+    if dates.dtype.kind == 'U' and not iso_shaped(dates):
+        raise ValueError('dates must be in the format YYYY-MM-DD')
+    dates = dates.astype('datetime64[D]')
+    if np.isnat(dates).any():
+        raise ValueError('dates must be in the format YYYY-MM-DD')
+    return (dates - epoch).astype(np.int64) + offset
+
+
+def dayth_to_dates(dayth, epoch=EPOCH, offset=DAYTH_OFFSET):
+    return epoch + (np.asarray(dayth, dtype=np.int64) - offset)
+
+
+def predict_dayth(const, coef, dayth, plus_bias=PLUS_BIAS, minus_bias=MINUS_BIAS):
+    dayth = np.asarray(dayth, dtype=np.float64)
     log2_pred = np.log2(dayth) * coef + const
-    price_pred = 2 ** log2_pred
+    price_pred = np.exp2(log2_pred)
+    return {
+        'log2_price': log2_pred,
+        'price': price_pred,
+        'plus_bias': price_pred * plus_bias,
+        'minus_bias': price_pred * minus_bias,
+        'log_plus_bias': log2_pred + np.log2(plus_bias),
+        'log_minus_bias': log2_pred + np.log2(minus_bias),
+    }
+
+
+def predict_dates(const, coef, dates, epoch=EPOCH, offset=DAYTH_OFFSET, **bands):
+    return predict_dayth(const, coef, dates_to_dayth(dates, epoch, offset), **bands)
+
+
+def predictor(const, coef, date_text):
+    pred = predict_dates(const, coef, [date_text])
+    return pred['price'][0], pred['log2_price'][0]
+
+
+class PredictionTable:
+    """Predictions for every day in MIN_DATE..MAX_DATE, stored as float32.
+
+    Rows are indexed by proleptic ordinal, so a lookup is one
+    ``date.fromisoformat`` call and an array index. The table starts later
+    than MIN_DATE for tickers whose day 1 comes after it.
+    """
+
+    def __init__(self, const, coef, epoch=EPOCH, offset=DAYTH_OFFSET,
+                 plus_bias=PLUS_BIAS, minus_bias=MINUS_BIAS, start=MIN_DATE, end=MAX_DATE):
+        self.const = const
+        self.coef = coef
+        self.bands = {'plus_bias': plus_bias, 'minus_bias': minus_bias}
+        self.start = max(start, epoch - (offset - 1))
+        self.end = end
+        self.first_ordinal = self.start.item().toordinal()
+        self.first_dayth = int(dates_to_dayth([self.start], epoch, offset)[0])
+        dayth = np.arange(self.first_dayth, int(dates_to_dayth([end], epoch, offset)[0]) + 1)
+        pred = predict_dayth(const, coef, dayth, **self.bands)
+        self.columns = {name: values.astype(np.float32) for name, values in pred.items()}
+        self.size = len(dayth)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def index(self, date_text):
+        """Row for an ISO date, None when it is outside the table.
+
+        Raises ValueError for anything that is not a YYYY-MM-DD string.
+        """
+        if not isinstance(date_text, str) or not iso_shaped([date_text]):
+            raise ValueError('dates must be in the format YYYY-MM-DD')
+        i = date.fromisoformat(date_text).toordinal() - self.first_ordinal
+        return i if 0 <= i < self.size else None
+
+    def take(self, dayth):
+        # Table rows where possible, computed on the fly outside the domain
+        dayth = np.asarray(dayth, dtype=np.int64)
+        rows = dayth - self.first_dayth
+        inside = (rows >= 0) & (rows < self.size)
+        if inside.all():
+            return {name: values[rows].astype(np.float64) for name, values in self.columns.items()}
+        result = predict_dayth(self.const, self.coef, dayth, **self.bands)
+        for name, values in self.columns.items():
+            result[name][inside] = values[rows[inside]]
+        return result
+
+
+@lru_cache(maxsize=32)
+def prediction_table(const, coef, epoch=EPOCH, offset=DAYTH_OFFSET, plus_bias=PLUS_BIAS, minus_bias=MINUS_BIAS):
+    # keyed on the parameters, so a new fit never reads a stale table
+    return PredictionTable(const, coef, epoch, offset, plus_bias, minus_bias)
+
 
-    return price_pred, log2_pred
\ No newline at end of file
+def ticker_table(spec):
+    return prediction_table(spec.const, spec.coef, spec.epoch, spec.offset, spec.plus_bias, spec.minus_bias)
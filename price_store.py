@@ -0,0 +1,201 @@
+import json
+import os
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from predictor import dates_to_dayth, dayth_to_dates, EPOCH, DAYTH_OFFSET
+from fitter import RunningFit
+from sketch import KLLSketch
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, fine as long as only one process writes the store
+    fcntl = None
+
+# Column name -> on-disk dtype. Only columns that do not depend on the
+# fitted model are stored, predictions are computed when the store is read.
+COLUMNS = {
+    'dayth': np.int32,
+    'Open': np.float64,
+    'log2open': np.float64,
+    'log2dayth': np.float64,
+}
+
+# Largest shift, in log2, the fit may move residuals already in the sketch
+# before the sketch is rebuilt against the current fit
+RESIDUAL_TOL = 0.01
+
+
+def derive_columns(dayth, open_):
+    dayth = np.asarray(dayth, dtype=np.int32)
+    open_ = np.asarray(open_, dtype=np.float64)
+    cols = {'dayth': dayth, 'Open': open_}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cols['log2open'] = np.log2(open_)
+    cols['log2dayth'] = np.log2(dayth.astype(np.float64))
+    return cols
+
+
+class PriceStore:
+    """Append-only daily price store, one raw memory-mapped file per column.
+
+    ``meta.json`` is the commit point: column files may hold trailing bytes
+    from an interrupted append, but only ``rows`` entries are ever read.
+    Appends hold an exclusive ``flock`` on the store directory, so writers in
+    different processes never interleave.
+    """
+
+    def __init__(self, root, ticker='BTC-USD', epoch=EPOCH, offset=DAYTH_OFFSET):
+        self.ticker = ticker
+        self.epoch = epoch
+        self.offset = offset
+        self.path = os.path.join(root, ticker)
+        os.makedirs(self.path, exist_ok=True)
+        self.meta = self._read_meta()
+
+    @property
+    def rows(self):
+        return self.meta['rows']
+
+    @property
+    def last_date(self):
+        if self.rows == 0:
+            return None
+        return dayth_to_dates(self.column('dayth')[-1], self.epoch, self.offset).item()
+
+    def column(self, name):
+        if self.rows == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self._column_path(name), dtype=COLUMNS[name], mode='r', shape=(self.rows,))
+
+    def columns(self):
+        return {name: self.column(name) for name in COLUMNS}
+
+    def fit(self):
+        """Running log-log regression sums over every stored bar."""
+        if 'fit' not in self.meta:
+            # stores written before the sums were kept, rebuild them once
+            self.meta['fit'] = RunningFit().update(self.column('log2dayth'), self.column('log2open')).to_dict()
+        return RunningFit.from_dict(self.meta['fit'])
+
+    def fit_params(self):
+        return self.fit().params()
+
+    def residual_sketch(self):
+        """Quantile sketch of log2(Open) minus the fitted log2 price."""
+        params = self.fit_params()
+        if params is None:
+            return KLLSketch()
+        state = self.meta.get('residuals')
+        if state is None or self._drift(state['fit'], params) > RESIDUAL_TOL:
+            state = self.meta['residuals'] = self._rebuild_residuals(params)
+        return KLLSketch.from_dict(state['sketch'])
+
+    def band_multipliers(self, quantiles):
+        """{name: quantile} -> {name: price multiplier at that residual quantile}."""
+        sketch = self.residual_sketch()
+        if len(sketch) == 0:
+            return {}
+        return {name: float(np.exp2(value)) for name, value in
+                zip(quantiles, sketch.quantiles(list(quantiles.values())))}
+
+    def _drift(self, reference, params):
+        # residual shift is linear in x, so it peaks at one end of the stored range
+        x = self.column('log2dayth')
+        d_const, d_coef = params[0] - reference[0], params[1] - reference[1]
+        return max(abs(d_const + d_coef * x[0]), abs(d_const + d_coef * x[-1]))
+
+    def _rebuild_residuals(self, params):
+        const, coef = params
+        residuals = self.column('log2open') - (const + coef * self.column('log2dayth'))
+        return {'fit': [const, coef], 'sketch': KLLSketch().update(residuals).to_dict()}
+
+    def _update_residuals(self, cols):
+        params = self.fit_params()
+        state = self.meta.get('residuals')
+        if params is None:
+            self.meta.pop('residuals', None)
+        elif state is None or self._drift(state['fit'], params) > RESIDUAL_TOL:
+            self.meta['residuals'] = self._rebuild_residuals(params)
+        else:
+            # new bars go in against the fit the sketch was built with
+            const, coef = state['fit']
+            sketch = KLLSketch.from_dict(state['sketch'])
+            sketch.update(cols['log2open'] - (const + coef * cols['log2dayth']))
+            state['sketch'] = sketch.to_dict()
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # closing the descriptor releases the lock
+            os.close(fd)
+
+    def append(self, dates, opens):
+        """Append bars strictly newer than the last stored date."""
+        with self._locked():
+            # another process may have appended since this store was opened
+            self.meta = self._read_meta()
+            return self._append(dates, opens)
+
+    def _append(self, dates, opens):
+        dayth = dates_to_dayth(dates, self.epoch, self.offset)
+        opens = np.asarray(opens, dtype=np.float64)
+        keep = ~np.isnan(opens)
+        if self.rows:
+            keep &= dayth > self.column('dayth')[-1]
+        dayth, opens = dayth[keep], opens[keep]
+        if len(dayth) == 0:
+            return 0
+        order = np.argsort(dayth, kind='stable')
+        dayth, opens = dayth[order], opens[order]
+        _, first = np.unique(dayth, return_index=True)
+        dayth, opens = dayth[first], opens[first]
+
+        cols = derive_columns(dayth, opens)
+        fit = self.fit().update(cols['log2dayth'], cols['log2open'])
+        for name, dtype in COLUMNS.items():
+            self._append_column(name, cols[name].astype(dtype))
+        self.meta['rows'] += len(dayth)
+        self.meta['fit'] = fit.to_dict()
+        self._update_residuals(cols)
+        self._write_meta()
+        return len(dayth)
+
+    def seed_from_csv(self, path):
+        legacy = pd.read_csv(path, usecols=['Date', 'Open'])
+        return self.append(pd.to_datetime(legacy['Date']).values, legacy['Open'].values)
+
+    def _column_path(self, name):
+        return os.path.join(self.path, name + '.bin')
+
+    def _append_column(self, name, values):
+        path = self._column_path(name)
+        nbytes = self.rows * np.dtype(COLUMNS[name]).itemsize
+        with open(path, 'ab') as f:
+            # drop bytes left behind by an append that never reached meta.json
+            if f.tell() != nbytes:
+                f.truncate(nbytes)
+            f.write(values.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json'), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'ticker': self.ticker, 'rows': 0, 'fit': RunningFit().to_dict()}
+
+    def _write_meta(self):
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
@@ -0,0 +1,188 @@
+"""Monte Carlo price paths around the power-law trend.
+
+The log2 residual against the fitted line is modelled as an AR(1) process,
+so simulated paths drift back towards the trend as history does. Its shocks
+are block-bootstrapped from the historical innovations, keeping their fat
+tails and volatility clustering. Paths are simulated ``chunk_paths`` at a
+time as one (horizon, paths) array, optionally on a process pool, and only a
+fixed residual histogram per day is kept. Percentile fans and band
+probabilities are read from those histograms.
+
+    python scenarios.py [TICKER] [--paths 20000] [--horizon 365] [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from predictor import dayth_to_dates
+
+HORIZON = 365
+PATHS = 20000
+BLOCK = 30
+CHUNK_PATHS = 4096
+PERCENTILES = (5, 25, 50, 75, 95)
+# log2 residual histogram, bins about 0.3% of the price wide
+LOW, HIGH, BINS = -8.0, 8.0, 4096
+WIDTH = (HIGH - LOW) / BINS
+
+
+def ar1(residuals):
+    """(phi, innovations) of r[t] = phi * r[t - 1] + e[t], fitted through the origin."""
+    r = np.asarray(residuals, dtype=np.float64)
+    phi = float(np.dot(r[1:], r[:-1]) / np.dot(r[:-1], r[:-1]))
+    phi = min(max(phi, 0.0), 1.0)
+    return phi, r[1:] - phi * r[:-1]
+
+
+def simulate_chunk(innovations, phi, r0, horizon, block, paths, seed):
+    """Residual histogram per day, (horizon, BINS) counts over ``paths`` paths."""
+    rng = np.random.default_rng(seed)
+    block = min(block, len(innovations))
+    starts = rng.integers(0, len(innovations) - block + 1, size=(-(-horizon // block), paths))
+    # consecutive days of one path read consecutive historical shocks
+    index = (starts[:, None, :] + np.arange(block)[None, :, None]).reshape(-1, paths)[:horizon]
+    r = innovations[index]
+    r[0] += phi * r0
+    for t in range(1, horizon):
+        r[t] += phi * r[t - 1]
+    bins = np.clip(((r - LOW) / WIDTH).astype(np.int64), 0, BINS - 1)
+    bins += np.arange(horizon)[:, None] * BINS
+    return np.bincount(bins.ravel(), minlength=horizon * BINS).reshape(horizon, BINS)
+
+
+def simulate(residuals, horizon=HORIZON, paths=PATHS, block=BLOCK, seed=0, workers=None, chunk_paths=CHUNK_PATHS):
+    """Summed residual histograms of ``paths`` simulated paths, and the fitted phi.
+
+    Chunks get their own seeds from one SeedSequence, so the result does not
+    depend on ``workers``.
+    """
+    residuals = np.asarray(residuals, dtype=np.float64)
+    residuals = residuals[np.isfinite(residuals)]
+    if len(residuals) < 2 * block:
+        raise ValueError(f'need at least {2 * block} residuals, got {len(residuals)}')
+    phi, innovations = ar1(residuals)
+    sizes = [min(chunk_paths, paths - lo) for lo in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(innovations, phi, residuals[-1], horizon, block, size, child) for size, child in zip(sizes, seeds)]
+    if workers:
+        # spawned, not forked: the caller may be a threaded web worker
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            counts = sum(pool.map(simulate_chunk, *zip(*jobs)))
+    else:
+        counts = sum(simulate_chunk(*job) for job in jobs)
+    return counts, phi
+
+
+def quantiles(counts, qs):
+    """Residual at each quantile per day, interpolated inside the histogram bin."""
+    cdf = np.cumsum(counts, axis=1)
+    total = cdf[:, -1:]
+    out = []
+    for q in qs:
+        target = q * total
+        i = (cdf >= target).argmax(axis=1)
+        rows = np.arange(len(cdf))
+        below = np.where(i > 0, cdf[rows, i - 1], 0)
+        inside = counts[rows, i]
+        frac = np.where(inside > 0, (target[:, 0] - below) / np.maximum(inside, 1), 0.0)
+        out.append(LOW + (i + frac) * WIDTH)
+    return np.array(out)
+
+
+def share_below(counts, level):
+    """Share of paths per day with a residual under ``level``."""
+    position = min(max((level - LOW) / WIDTH, 0.0), float(BINS))
+    i = int(position)
+    below = counts[:, :i].sum(axis=1) + (counts[:, i] * (position - i) if i < BINS else 0)
+    return below / counts.sum(axis=1)
+
+
+def run_scenarios(spec, dataset, horizon=HORIZON, paths=PATHS, block=BLOCK, seed=0, workers=None,
+                  chunk_paths=CHUNK_PATHS, percentiles=PERCENTILES):
+    """Fan chart percentiles and band probabilities for the days after the last bar."""
+    started = time.perf_counter()
+    observed = np.isfinite(dataset['Open'])
+    residuals = dataset['log2open'][observed].astype(np.float64) - dataset['PredictedLog2Open'][observed]
+    counts, phi = simulate(residuals, horizon, paths, block, seed, workers, chunk_paths)
+    dayth = dataset['dayth'][observed][-1] + np.arange(1, horizon + 1)
+    model = spec.const + spec.coef * np.log2(dayth)
+    levels = {'minus_bias': spec.minus_bias, 'buy': spec.buy, 'model': 1.0, 'sell': spec.sell, 'plus_bias': spec.plus_bias}
+    return {
+        'ticker': spec.symbol,
+        'dates': dayth_to_dates(dayth, spec.epoch, spec.offset),
+        'dayth': dayth,
+        'model': np.exp2(model),
+        'percentiles': {q: np.exp2(model + r) for q, r in zip(percentiles, quantiles(counts, [q / 100 for q in percentiles]))},
+        # chance the price is under each multiple of the model on that day
+        'below': {name: share_below(counts, np.log2(value)) for name, value in levels.items()},
+        'paths': paths,
+        'block': block,
+        'phi': phi,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def to_json(result):
+    def lists(values):
+        return [round(float(v), 6) for v in values]
+    return {
+        **result,
+        'dates': result['dates'].astype(str).tolist(),
+        'dayth': result['dayth'].tolist(),
+        'model': lists(result['model']),
+        'percentiles': {str(q): lists(values) for q, values in result['percentiles'].items()},
+        'below': {name: lists(values) for name, values in result['below'].items()},
+    }
+
+
+class ScenarioCache:
+    """One result per ticker, recomputed when its dataset or fit changes."""
+
+    def __init__(self, **options):
+        self.options = options
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get(self, spec, dataset):
+        # forecast days pad the dataset, so its length does not move when a bar is appended
+        version = (dataset.observed, spec.const, spec.coef, spec.minus_bias, spec.buy, spec.sell, spec.plus_bias)
+        cached = self._results.get(spec.symbol)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._lock:
+            cached = self._results.get(spec.symbol)
+            if cached is None or cached[0] != version:
+                cached = self._results[spec.symbol] = version, run_scenarios(spec, dataset, **self.options)
+            return cached[1]
+
+
+if __name__ == '__main__':
+    from df_maker import load_ticker
+    from tickers import load_registry
+    parser = argparse.ArgumentParser(description='Simulate forward price paths around the power-law trend.')
+    parser.add_argument('ticker', nargs='?', help='ticker to simulate, default default_ticker')
+    parser.add_argument('--paths', type=int, default=PATHS)
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='days ahead')
+    parser.add_argument('--block', type=int, default=BLOCK, help='bootstrap block length in days')
+    parser.add_argument('--workers', type=int, help='simulate on a process pool of this size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the full result as JSON')
+    args = parser.parse_args()
+    with open('configs.json', 'r') as f:
+        configs = json.load(f)
+    symbol = args.ticker or configs.get('default_ticker', 'BTC-USD')
+    spec, dataset = load_ticker(load_registry(configs)[symbol], os.environ.get('CRYPLOT_STORE', configs['store_path']),
+                                refresh=False, calibration=configs.get('calibration'))
+    result = run_scenarios(spec, dataset, args.horizon, args.paths, args.block, args.seed, args.workers)
+    if args.json:
+        print(json.dumps(to_json(result), indent=2))
+    else:
+        print(f"{symbol}: {result['paths']} paths, {args.horizon} days, phi={result['phi']:.4f}, {result['seconds']:.2f}s")
+        for i in sorted({0, 29, 89, 179, args.horizon - 1} & set(range(args.horizon))):
+            fan = '  '.join(f"p{q}=${values[i]:,.0f}" for q, values in result['percentiles'].items())
+            print(f"  {result['dates'][i]}  model=${result['model'][i]:,.0f}  {fan}  "
+                  f"P(<buy)={result['below']['buy'][i]:.0%} P(>sell)={1 - result['below']['sell'][i]:.0%}")
@@ -0,0 +1,217 @@
+"""Rank a ticker universe by where each price sits in its fitted power-law band.
+
+Histories are fetched in batches on a bounded thread pool and fitted on a
+process pool. A day's results are cached in ``<store>/screener/<date>.json``
+so every later view that day, from any process, is a file read.
+
+    python screener.py [SYMBOL ...] [--top 20] [--refresh] [--json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+from fitter import RunningFit
+from predictor import dates_to_dayth
+from sources import default_source
+from tickers import CALIBRATION
+
+BATCH_SIZE = 50
+COLUMNS = ['symbol', 'last_date', 'price', 'model_price', 'ratio', 'band_position',
+           'residual_percentile', 'coef', 'r2', 'bars']
+
+
+def screen_day():
+    # crypto trades every day, a UTC date is one trading day
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def universe_specs(configs, symbols=None):
+    """(symbol, epoch, offset) for registry tickers plus ``screener.universe``.
+
+    Tickers outside the registry count days from their first bar, shifted by
+    ``screener.gap_days``.
+    """
+    from tickers import load_registry
+    registry = load_registry(configs)
+    screener_configs = configs.get('screener', {})
+    gap_days = screener_configs.get('gap_days', 0)
+    symbols = symbols or list(dict.fromkeys(list(registry) + screener_configs.get('universe', [])))
+    return [(symbol, registry[symbol].epoch, registry[symbol].offset) if symbol in registry
+            else (symbol, None, gap_days + 1) for symbol in symbols]
+
+
+def fetch_histories(symbols, io_workers=4, batch_size=BATCH_SIZE, source=None):
+    """Full daily histories, one batched request per ``batch_size`` symbols."""
+    source = source or default_source()
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+    histories = {}
+    with ThreadPoolExecutor(max_workers=io_workers) as pool:
+        for batch, future in zip(batches, [pool.submit(source.history_many, dict.fromkeys(batch)) for batch in batches]):
+            try:
+                histories.update(future.result())
+            except Exception as e:
+                print(f"Could not fetch {', '.join(batch)}: {e}")
+    return histories
+
+
+def fit_ticker(symbol, dates, opens, epoch, offset, quantiles):
+    """Fit one history and locate its last price in the residual band.
+
+    Runs in a pool process, so it only takes and returns plain values.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    opens = np.asarray(opens, dtype=np.float64)
+    ok = np.isfinite(opens) & (opens > 0)
+    dates, opens = dates[ok], opens[ok]
+    if len(dates) < 30:
+        return None
+    epoch = dates[0] if epoch is None else np.datetime64(epoch, 'D')
+    dayth = dates_to_dayth(dates, epoch, offset)
+    keep = dayth > 0
+    dayth, dates, opens = dayth[keep], dates[keep], opens[keep]
+    x, y = np.log2(dayth.astype(np.float64)), np.log2(opens)
+    params = RunningFit().update(x, y).params()
+    if params is None:
+        return None
+    const, coef = params
+    residuals = y - (const + coef * x)
+    lower, upper = np.quantile(residuals, [quantiles['minus_bias'], quantiles['plus_bias']])
+    last = residuals[-1]
+    return {
+        'symbol': symbol,
+        'last_date': str(dates[-1]),
+        'price': float(opens[-1]),
+        'model_price': float(np.exp2(const + coef * x[-1])),
+        'ratio': float(np.exp2(last)),
+        # 0 on the lower band, 1 on the upper one, outside [0, 1] beyond them
+        'band_position': float((last - lower) / (upper - lower)) if upper > lower else 0.5,
+        'residual_percentile': float((residuals <= last).mean() * 100),
+        'coef': float(coef),
+        'r2': float(1 - residuals.var() / y.var()) if y.var() > 0 else 0.0,
+        'bars': int(len(dayth)),
+    }
+
+
+def run_screen(specs, io_workers=4, cpu_workers=None, batch_size=BATCH_SIZE, quantiles=None, source=None):
+    """Rows sorted from cheapest to richest relative to each fitted band."""
+    quantiles = {**CALIBRATION, **(quantiles or {})}
+    histories = fetch_histories([symbol for symbol, _, _ in specs], io_workers, batch_size, source)
+    jobs = [(symbol, histories[symbol].index.values.astype('datetime64[D]'), histories[symbol]['Open'].to_numpy(),
+             None if epoch is None else str(epoch), offset, quantiles)
+            for symbol, epoch, offset in specs if symbol in histories and not histories[symbol].empty]
+    if not jobs:
+        return []
+    # spawned, not forked: the caller may be a threaded web worker
+    with ProcessPoolExecutor(max_workers=cpu_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        rows = [row for row in pool.map(fit_ticker, *zip(*jobs), chunksize=max(1, len(jobs) // 32)) if row]
+    return sorted(rows, key=lambda row: row['band_position'])
+
+
+class Screener:
+    """Today's screen, computed at most once per day and shared through a file.
+
+    ``start`` runs this module's CLI in a child process, so a web worker
+    neither forks its process pool nor spends its own CPU on the fits.
+    """
+
+    def __init__(self, root, specs, **options):
+        self.root = root
+        self.path = os.path.join(root, 'screener')
+        self.specs = specs
+        self.options = options
+        self.error = None
+        self._memo = (None, None)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _file(self, day):
+        return os.path.join(self.path, f'{day}.json')
+
+    def cached(self, day=None):
+        day = day or screen_day()
+        if self._memo[0] == day:
+            return self._memo[1]
+        try:
+            with open(self._file(day), 'r') as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        self._memo = (day, result)
+        return result
+
+    def compute(self, day=None):
+        day = day or screen_day()
+        started = time.perf_counter()
+        rows = run_screen(self.specs, **self.options)
+        result = {'day': day, 'rows': rows, 'seconds': time.perf_counter() - started}
+        os.makedirs(self.path, exist_ok=True)
+        tmp = f'{self._file(day)}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, self._file(day))
+        self._memo = (day, result)
+        return result
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Compute today's screen in the background unless it exists or is under way."""
+        with self._lock:
+            if self.running() or self.cached() is not None:
+                return
+            self.error = None
+            self._thread = threading.Thread(target=self._run, name='screener', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        script = os.path.abspath(__file__)
+        done = subprocess.run([sys.executable, script, '--refresh', '--top', '0'], cwd=os.path.dirname(script),
+                              env={**os.environ, 'CRYPLOT_STORE': self.root}, capture_output=True, text=True)
+        if done.returncode != 0:
+            lines = done.stderr.strip().splitlines()
+            self.error = lines[-1] if lines else f'exit code {done.returncode}'
+            print(f"Screener failed: {self.error}")
+
+
+def format_rows(rows, top=None):
+    lines = [f"{'#':>3} {'symbol':<16} {'last':<10} {'price':>12} {'model':>12} {'ratio':>6} {'band':>6} {'pct':>5} {'coef':>6} {'r2':>5}"]
+    for i, row in enumerate(rows if top is None else rows[:top], 1):
+        lines.append(f"{i:>3} {row['symbol']:<16} {row['last_date']:<10} {row['price']:>12,.4g} {row['model_price']:>12,.4g} "
+                     f"{row['ratio']:>6.2f} {row['band_position']:>6.2f} {row['residual_percentile']:>5.1f} "
+                     f"{row['coef']:>6.2f} {row['r2']:>5.2f}")
+    return lines
+
+
+if __name__ == '__main__':
+    from sources import set_default_source, source_from_config
+    parser = argparse.ArgumentParser(description='Rank tickers by position in their fitted power-law band.')
+    parser.add_argument('symbols', nargs='*', help='tickers to screen, default the registry plus screener.universe')
+    parser.add_argument('--top', type=int, help='only print the first N rows')
+    parser.add_argument('--refresh', action='store_true', help="recompute even if today's screen is cached")
+    parser.add_argument('--json', action='store_true', help='print the result as JSON')
+    args = parser.parse_args()
+    with open('configs.json', 'r') as f:
+        configs = json.load(f)
+    set_default_source(source_from_config(configs.get('data_source')))
+    screener_configs = configs.get('screener', {})
+    screener = Screener(os.environ.get('CRYPLOT_STORE', configs['store_path']), universe_specs(configs, args.symbols),
+                        io_workers=screener_configs.get('io_workers', 4), cpu_workers=screener_configs.get('cpu_workers'),
+                        batch_size=screener_configs.get('batch_size', BATCH_SIZE), quantiles=configs.get('calibration'))
+    if args.symbols:
+        # ad hoc lists are not today's screen, never cache them
+        result = {'day': screen_day(), 'rows': run_screen(screener.specs, **screener.options)}
+    else:
+        result = None if args.refresh else screener.cached()
+        result = result or screener.compute()
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print('\n'.join(format_rows(result['rows'], args.top)))
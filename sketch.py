@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Level h holds items standing for 2**h inputs each. A full level is sorted
+    and every other item moves up a level, alternating which half survives,
+    so memory stays O(k log(n/k)) with rank error around 1.7 / k.
+    Serializes to plain lists for ``meta.json``.
+    """
+
+    def __init__(self, k=400, levels=None, n=0, coin=0):
+        self.k = k
+        self.levels = [list(level) for level in levels] if levels else [[]]
+        self.n = n
+        self.coin = coin
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, h):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - h - 1))))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        self.levels[0].extend(values.tolist())
+        self.n += int(len(values))
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in zip(self.levels, other.levels):
+            level.extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) < self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            items = np.sort(level)
+            # an odd item stays behind so the compacted weight is exact
+            keep = [items[-1]] if len(items) % 2 else []
+            pairs = items[:len(items) - len(keep)]
+            self.levels[h + 1].extend(pairs[self.coin::2].tolist())
+            self.levels[h] = [float(v) for v in keep]
+            self.coin ^= 1
+            # capacities shrink when a level is added, start over from the bottom
+            h = 0
+
+    def quantiles(self, qs):
+        """Approximate quantiles, NaN while the sketch is empty."""
+        qs = np.asarray(qs, dtype=np.float64)
+        items = np.concatenate([np.asarray(level, dtype=np.float64) for level in self.levels])
+        if len(items) == 0:
+            return np.full(qs.shape, np.nan)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = qs * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)]
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def to_dict(self):
+        return {'k': self.k, 'n': self.n, 'coin': self.coin, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['k'], data['levels'], data['n'], data['coin'])
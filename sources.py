@@ -0,0 +1,260 @@
+"""Market data backends behind one small interface.
+
+Every backend returns daily bars as a DataFrame with a tz-naive, day-floored
+DatetimeIndex and an ``Open`` column. ``YFinanceSource`` talks to Yahoo with
+timeouts, bounded retries, one pooled session and batched downloads, and
+coalesces identical requests already in flight. ``ReplaySource`` answers from
+recorded ``<TICKER>.csv`` files (Date,Open) or in-memory frames, for tests,
+benchmarks and offline runs.
+"""
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+import pandas as pd
+from metrics import time_fetch
+
+Quote = namedtuple('Quote', ['price', 'date', 'fetched_at'])
+
+
+def normalize(data):
+    """Daily bars as an ``Open`` column on a tz-naive date index."""
+    if data is None or data.empty:
+        return pd.DataFrame({'Open': []}, index=pd.DatetimeIndex([], name='Date'))
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = pd.DataFrame({'Open': data['Open'].to_numpy(dtype='float64')}, index=index.floor('D').rename('Date'))
+    return frame.dropna()
+
+
+def normalize_intraday(data):
+    """Intraday bars as a ``Close`` column on a tz-naive UTC timestamp index."""
+    if data is None or data.empty:
+        return pd.DataFrame({'Close': []}, index=pd.DatetimeIndex([], name='Datetime'))
+    index = pd.DatetimeIndex(data.index)
+    index = index.tz_convert('UTC').tz_localize(None) if index.tz is not None else index
+    frame = pd.DataFrame({'Close': data['Close'].to_numpy(dtype='float64')}, index=index.rename('Datetime'))
+    return frame.dropna()
+
+
+def since(frame, start):
+    if start is None:
+        return frame
+    return frame[frame.index >= pd.Timestamp(start)]
+
+
+def quote_from(frame, symbol):
+    if frame.empty:
+        raise LookupError(f'no quote for {symbol}')
+    return Quote(price=float(frame['Open'].iloc[-1]), date=frame.index[-1].strftime('%Y-%m-%d'),
+                 fetched_at=time.time())
+
+
+class SingleFlight:
+    """Callers asking for a key that is already being fetched share that result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+        try:
+            call.set_result(fn())
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return call.result()
+
+
+def with_retries(fn, retries=3, backoff=1.0, max_backoff=30.0):
+    """Call ``fn``, retrying failures with jittered exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(min(max_backoff, backoff * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+
+class DataSource:
+    """Daily bars and latest quotes for ticker symbols."""
+
+    def history(self, symbol, start=None):
+        raise NotImplementedError
+
+    def history_many(self, starts):
+        """{symbol: start} -> {symbol: bars}, one request where the backend allows."""
+        return {symbol: self.history(symbol, start) for symbol, start in starts.items()}
+
+    def quote(self, symbol):
+        raise NotImplementedError
+
+    def intraday(self, symbol, start=None):
+        """Minute bars after ``start`` (a UTC datetime), the last day's for None."""
+        raise NotImplementedError
+
+
+class YFinanceSource(DataSource):
+
+    def __init__(self, timeout=10, retries=3, backoff=1.0, threads=4):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.threads = threads
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    @property
+    def session(self):
+        # one pooled session for every request; recent yfinance only accepts
+        # curl_cffi sessions and otherwise shares its own
+        with self._session_lock:
+            if self._session is None:
+                try:
+                    from curl_cffi import requests as curl_requests
+                except ImportError:
+                    return None
+                self._session = curl_requests.Session(impersonate='chrome')
+            return self._session
+
+    def _call(self, key, label, fn):
+        def attempt():
+            with time_fetch(label, key[0]):
+                return fn()
+        return self._flight.do(key, lambda: with_retries(attempt, self.retries, self.backoff))
+
+    def history(self, symbol, start=None):
+        import yfinance as yf
+
+        def fetch():
+            ticker = yf.Ticker(symbol, session=self.session)
+            if start is None:
+                data = normalize(ticker.history(period='max', timeout=self.timeout))
+            else:
+                data = normalize(ticker.history(start=start, timeout=self.timeout))
+            # yfinance logs failed requests and returns an empty frame; only today's bar may not exist yet
+            if data.empty and (start is None or pd.Timestamp(start) < pd.Timestamp.now().normalize()):
+                raise LookupError(f'no history for {symbol}')
+            return data
+        return self._call(('history', symbol, start), symbol, fetch)
+
+    def history_many(self, starts):
+        if len(starts) <= 1:
+            return super().history_many(starts)
+        import yfinance as yf
+        symbols = sorted(starts)
+        first = min((start for start in starts.values() if start is not None), default=None)
+
+        def fetch():
+            kwargs = {'start': first} if first is not None else {'period': 'max'}
+            data = yf.download(symbols, group_by='ticker', auto_adjust=True, progress=False,
+                               threads=self.threads, timeout=self.timeout, session=self.session, **kwargs)
+            if data is None or data.empty:
+                raise LookupError(f'no history for {", ".join(symbols)}')
+            return {symbol: since(normalize(data[symbol]) if symbol in data.columns.get_level_values(0) else normalize(None),
+                                  starts[symbol])
+                    for symbol in symbols}
+        return self._call(('history', tuple(symbols), first), 'batch', fetch)
+
+    def quote(self, symbol):
+        import yfinance as yf
+
+        def fetch():
+            data = yf.Ticker(symbol, session=self.session).history(period='1d', timeout=self.timeout)
+            return quote_from(normalize(data), symbol)
+        return self._call(('quote', symbol), symbol, fetch)
+
+    def intraday(self, symbol, start=None):
+        import yfinance as yf
+
+        def fetch():
+            ticker = yf.Ticker(symbol, session=self.session)
+            if start is None:
+                data = ticker.history(period='1d', interval='1m', timeout=self.timeout)
+            else:
+                # Yahoo takes whole seconds, bars at ``start`` itself are dropped by the caller
+                data = ticker.history(start=pd.Timestamp(start, tz='UTC').floor('min'), interval='1m',
+                                      timeout=self.timeout)
+            return normalize_intraday(data)
+        return self._call(('intraday', symbol, start), symbol, fetch)
+
+
+class ReplaySource(DataSource):
+    """Recorded histories; a quote is the last recorded bar.
+
+    Minute bars are read from ``<TICKER>-1m.csv`` (Datetime,Close in UTC).
+    """
+
+    def __init__(self, path=None, histories=None):
+        self.path = path
+        self._histories = {symbol: normalize(data) for symbol, data in (histories or {}).items()}
+        self._lock = threading.Lock()
+
+    def _load(self, symbol):
+        with self._lock:
+            if symbol not in self._histories:
+                csv = os.path.join(self.path, symbol + '.csv') if self.path else None
+                if csv and os.path.exists(csv):
+                    data = pd.read_csv(csv, index_col='Date', parse_dates=['Date'])
+                else:
+                    data = None
+                self._histories[symbol] = normalize(data)
+            return self._histories[symbol]
+
+    def history(self, symbol, start=None):
+        return since(self._load(symbol), start)
+
+    def quote(self, symbol):
+        return quote_from(self._load(symbol), symbol)
+
+    def intraday(self, symbol, start=None):
+        key = symbol + '-1m'
+        with self._lock:
+            if key not in self._histories:
+                csv = os.path.join(self.path, key + '.csv') if self.path else None
+                data = pd.read_csv(csv, index_col='Datetime', parse_dates=['Datetime']) if csv and os.path.exists(csv) else None
+                self._histories[key] = normalize_intraday(data)
+            data = self._histories[key]
+        return data if start is None else data[data.index > pd.Timestamp(start)]
+
+
+def source_from_config(entry):
+    """``CRYPLOT_REPLAY_DIR`` or ``replay_dir`` replays recordings, otherwise Yahoo."""
+    entry = dict(entry or {})
+    replay_dir = os.environ.get('CRYPLOT_REPLAY_DIR') or entry.pop('replay_dir', None)
+    if replay_dir:
+        return ReplaySource(replay_dir)
+    entry.pop('replay_dir', None)
+    return YFinanceSource(**entry)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_source():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = source_from_config({})
+        return _default
+
+
+def set_default_source(source):
+    global _default
+    with _default_lock:
+        _default = source
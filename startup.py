@@ -0,0 +1,98 @@
+"""Startup trace: where the time goes between ``import app`` and the first ready request.
+
+The app records each import and init phase it times here. ``/readyz``
+serves the report; this module's CLI imports and warms the app and
+prints it, failing when the import alone exceeds a budget.
+
+    python startup.py [--budget 1.5] [--json]
+"""
+import argparse
+import importlib
+import json
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+
+
+class StartupTrace:
+    """Seconds per import and per init phase, in the order they ran."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.imports = []
+        self.phases = []
+        self.error = None
+
+    @contextmanager
+    def importing(self, name):
+        # only a first import costs anything, later ones are a dict lookup
+        started = time.perf_counter()
+        yield
+        self.imports.append((name, time.perf_counter() - started))
+
+    def import_module(self, name):
+        if name in sys.modules:
+            return sys.modules[name]
+        with self.importing(name):
+            return importlib.import_module(name)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.error = f'{name}: {e}'
+            traceback.print_exc()
+            raise
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def report(self):
+        end = self.finished or time.perf_counter()
+        return {
+            'seconds': round(end - self.started, 4),
+            'finished': self.finished is not None,
+            'error': self.error,
+            'imports': [{'name': name, 'seconds': round(s, 4)} for name, s in self.imports],
+            'phases': [{'name': name, 'seconds': round(s, 4)} for name, s in self.phases],
+        }
+
+    def summary(self):
+        steps = ', '.join(f'{name} {s:.2f}s' for name, s in self.phases)
+        return f"Ready in {(self.finished or time.perf_counter()) - self.started:.2f}s ({steps})"
+
+
+def format_report(report):
+    lines = [f"{'total':<28} {report['seconds']:>8.3f}s"]
+    for kind in ('imports', 'phases'):
+        lines.append(kind)
+        lines.extend(f"  {step['name']:<26} {step['seconds']:>8.3f}s" for step in report[kind])
+    if report['error']:
+        lines.append(f"error: {report['error']}")
+    return lines
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import and warm the app, then report where startup time went.')
+    parser.add_argument('--budget', type=float, help='fail if importing app.py takes longer, in seconds')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    import app
+    imported = time.perf_counter() - started
+    app.warm_up()
+    report = {'import_app_seconds': round(imported, 4), **app.trace.report()}
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'import app':<28} {imported:>8.3f}s")
+        print('\n'.join(format_report(report)))
+    if args.budget is not None and imported > args.budget:
+        print(f"import app took {imported:.2f}s, over the {args.budget:.2f}s budget", file=sys.stderr)
+        sys.exit(1)
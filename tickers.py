@@ -0,0 +1,52 @@
+from collections import namedtuple
+import numpy as np
+from predictor import PLUS_BIAS, MINUS_BIAS
+
+# epoch + gap_days: dayth is 1 + gap_days on the epoch date, as in the
+# alt coin notebook. const/coef left as None are fitted from the data, band
+# and buy/sell multipliers left as None are calibrated from its residuals.
+class TickerSpec(namedtuple('TickerSpec', [
+        'symbol', 'label', 'epoch', 'gap_days', 'const', 'coef',
+        'plus_bias', 'minus_bias', 'buy', 'sell', 'data_path'])):
+    __slots__ = ()
+
+    @property
+    def offset(self):
+        return self.gap_days + 1
+
+
+def ticker_spec(symbol, entry):
+    return TickerSpec(
+        symbol=symbol,
+        label=entry.get('label', symbol.replace('-', '/')),
+        epoch=np.datetime64(entry['epoch'], 'D'),
+        gap_days=entry.get('gap_days', 0),
+        const=entry.get('const'),
+        coef=entry.get('coef'),
+        plus_bias=entry.get('plus_bias'),
+        minus_bias=entry.get('minus_bias'),
+        buy=entry.get('buy'),
+        sell=entry.get('sell'),
+        data_path=entry.get('data_path'),
+    )
+
+
+# Residual quantile each multiplier is calibrated to, and the multiplier used
+# while a store has too little history to calibrate
+CALIBRATION = {'plus_bias': 0.99, 'minus_bias': 0.01, 'buy': 0.1, 'sell': 0.9}
+UNCALIBRATED = {'plus_bias': PLUS_BIAS, 'minus_bias': MINUS_BIAS, 'buy': 0.6, 'sell': 1.8}
+
+
+def calibrate(spec, store, quantiles=None):
+    """Fill the multipliers the registry left as None from the store's residual sketch."""
+    quantiles = {**CALIBRATION, **(quantiles or {})}
+    missing = {name: q for name, q in quantiles.items() if getattr(spec, name) is None}
+    if not missing:
+        return spec
+    values = store.band_multipliers(missing)
+    return spec._replace(**{name: values.get(name, UNCALIBRATED[name]) for name in missing})
+
+
+def load_registry(configs):
+    return {symbol: ticker_spec(symbol, entry) for symbol, entry in configs['tickers'].items()}
+